@@ -1,16 +1,25 @@
+import argparse
+import functools
+import hashlib
+import json
 import subprocess
 import sys
 import platform
 import os
 import shutil
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 # All modules from the 'utils' package.
 import utils.bash_configurator, utils.zsh_configurator, utils.alias_manager, utils.ghidra_installer
-import utils.vscode_installer, utils.fzf_installer, utils.tmux_installer, utils.john_installer
-import utils.hashcat_installer, utils.uv_tools_installer, utils.nmap_installer, utils.rlwrap_installer
-import utils.sqlmap_installer, utils.docker_installer, utils.service_manager, utils.proxychains_installer
-import utils.command_runner, utils.xclip_installer
+import utils.vscode_installer, utils.go_builder, utils.tmux_configurator, utils.source_builder
+import utils.uv_tools_installer, utils.sqlmap_installer, utils.docker_installer, utils.service_manager
+import utils.command_runner, utils.fleet_manager, utils.version_tracker
+import utils.versioned_install, utils.build_workspace, utils.build_profiles, utils.cracking_benchmark
+import utils.run_journal, utils.privileged_helper, utils.cargo_builder, utils.health_check, utils.event_stream
+import utils.tool_profiles, utils.staged_install, utils.mirror_selector, utils.artifact_store
 
 # --- SCRIPT CONFIGURATION ---
 # Final update with all dependencies
@@ -18,39 +27,61 @@ PACKAGE_MAP = {
     "debian": {
         "manager": "apt",
         "packages": [
-            "build-essential", "default-jdk", "golang", "curl", "git", "unzip", "gpg", "python3-dev",
+            "build-essential", "golang", "curl", "git", "unzip", "gpg", "python3-dev",
             "libevent-dev", "ncurses-dev", "automake", "bison", "pkg-config", "libssl-dev",
-            "p7zip-full", "ocl-icd-opencl-dev", "libgmp-dev", "libxxhash-dev", "libpcap-dev",
-            "libssh2-1-dev", "libreadline-dev", "autoconf", "libptytty-dev", "docker.io",
-            "docker-compose", "default-mysql-server", "sqlite3", "php", "apache2", "gdb",
-            "openvpn", "krb5-user", "libkrb5-dev", "wget", "vim", "android-tools-adb", "binutils",
-            "libx11-dev", "libxmu-dev", "libxext-dev", "ldap-utils", "ruby", "ruby-dev", "wireshark",
-            "tshark", "jq", "faketime", "mingw-w64", "gh", "net-snmp", "perl-image-exiftool",
+            "p7zip-full", "libpcap-dev", "libssh2-1-dev", "libreadline-dev", "autoconf", "libptytty-dev",
+            "docker.io", "docker-compose", "sqlite3", "openvpn", "wget", "vim", "binutils",
+            "wireshark", "tshark", "jq", "mingw-w64", "gh", "net-snmp", "perl-image-exiftool",
+            "ccache",
         ],
+        # "packages" are always installed; these only when one of the tags is selected (see utils/tool_profiles.py)
+        "tagged_packages": {
+            "ad": ["krb5-user", "libkrb5-dev", "ldap-utils", "faketime"],
+            "web": ["default-mysql-server", "php", "apache2", "ruby", "ruby-dev"],
+            "re": ["default-jdk", "gdb", "android-tools-adb"],
+            "cracking": ["ocl-icd-opencl-dev", "libgmp-dev", "libxxhash-dev"],
+            "desktop": ["libx11-dev", "libxmu-dev", "libxext-dev", "code"],
+        },
         "update_cmd": ["apt", "update"]
     },
     "fedora": {
         "manager": "dnf",
         "packages": [
-            "@development-tools", "java-latest-openjdk-devel", "golang", "curl", "git", "unzip", "gpg", "python3-devel",
+            "@development-tools", "golang", "curl", "git", "unzip", "gpg", "python3-devel",
             "libevent-devel", "ncurses-devel", "automake", "bison", "pkgconf-pkg-config", "openssl-devel", "p7zip",
-            "ocl-icd-devel", "gmp-devel", "xxhash-devel", "libpcap-devel", "libssh2-devel", "readline-devel", "autoconf",
-            "libptytty-devel", "docker", "docker-compose", "mariadb-server", "sqlite", "php", "openvpn",
-            "krb5-workstation", "krb5-devel", "wget", "vim", "android-tools", "binutils", "gdb", "gh",
-            "libX11-devel", "libXmu-devel", "libXext-devel", "openldap-clients", "ruby", "ruby-dev",
-            "wireshark-qt", "wireshark-cli", "jq", "faketime", "mingw64-gcc", "net-snmp", "perl-Image-ExifTool",
-        ], "update_cmd": []
+            "libpcap-devel", "libssh2-devel", "readline-devel", "autoconf", "libptytty-devel", "docker",
+            "docker-compose", "sqlite", "openvpn", "wget", "vim", "binutils", "gh",
+            "wireshark-qt", "wireshark-cli", "jq", "mingw64-gcc", "net-snmp", "perl-Image-ExifTool",
+            "ccache",
+        ],
+        "tagged_packages": {
+            "ad": ["krb5-workstation", "krb5-devel", "openldap-clients", "faketime"],
+            "web": ["mariadb-server", "php", "ruby", "ruby-dev"],
+            "re": ["java-latest-openjdk-devel", "gdb", "android-tools"],
+            "cracking": ["ocl-icd-devel", "gmp-devel", "xxhash-devel"],
+            "desktop": ["libX11-devel", "libXmu-devel", "libXext-devel", "code"],
+        },
+        "update_cmd": []
     },
     "arch": {
         "manager": "pacman",
         "packages": [
-            "base-devel", "jdk-openjdk", "go", "curl", "git", "unzip", "gnupg", "libevent", "ncurses", "automake", "bison",
-            "pkg-config", "openssl", "p7zip", "opencl-icd-loader", "gmp", "xxhash", "libpcap", "libssh2", "readline",
-            "libptytty", "docker", "docker-compose", "mariadb", "sqlite", "php", "openvpn", "krb5", "wget",
-            "libx11", "libxmu", "libxext", "vim", "android-tools", "binutils", "gdb", "openldap", "github-cli",
-            "ruby", "wireshark-qt", "wireshark-cli", "jq", "mingw-w64-gcc", "code", "clang", "llvm",
-            "net-snmp", "perl-image-exiftool",
-        ], "update_cmd": ["pacman", "-Syu", "--noconfirm"]
+            "base-devel", "go", "curl", "git", "unzip", "gnupg", "libevent", "ncurses", "automake", "bison",
+            "pkg-config", "openssl", "p7zip", "libpcap", "libssh2", "readline", "libptytty", "docker",
+            "docker-compose", "sqlite", "openvpn", "wget", "vim", "binutils", "github-cli",
+            "wireshark-qt", "wireshark-cli", "jq", "mingw-w64-gcc", "clang", "llvm",
+            "net-snmp", "perl-image-exiftool", "ccache",
+        ],
+        "tagged_packages": {
+            "ad": ["krb5", "openldap"],
+            "web": ["mariadb", "php", "ruby"],
+            "re": ["jdk-openjdk", "gdb", "android-tools"],
+            "cracking": ["opencl-icd-loader", "gmp", "xxhash"],
+            "desktop": ["libx11", "libxmu", "libxext", "code"],
+        },
+        "update_cmd": ["pacman", "-Syu", "--noconfirm"],
+        # The background prefetch only downloads the upgrade; the install run applies it from the cache
+        "prefetch_update_cmd": ["pacman", "-Syuw", "--noconfirm"]
     },
 }
 
@@ -101,7 +132,193 @@ def get_system_info():
         except ImportError: print("FATAL: 'distro' package not available."); sys.exit(1)
     return platform.system().lower()
 
-def install_system_packages():
+# Output of the background download-only transaction (see start_package_prefetch).
+PREFETCH_LOG = os.path.expanduser("~/.local/share/autoinstaller/logs/package-prefetch.log")
+
+# Download settings applied to every package manager command of the run. They are passed on the
+# command line ('-o' for apt, '--setopt' for dnf, a temporary copy of pacman.conf given with
+# '--config' for pacman), so the system configuration is never modified and nothing has to be
+# restored afterwards, even if the run is interrupted.
+PARALLEL_DOWNLOADS = 10
+PACKAGE_MANAGER_TUNING = {
+    # apt already uses one connection per host and pipelines HTTP requests by default; the 'access'
+    # queue mode would only serialize the downloads further. Retries ride out flaky mirrors.
+    "apt": ["-o", "Acquire::Retries=3"],
+    "dnf": [f"--setopt=max_parallel_downloads={PARALLEL_DOWNLOADS}", "--setopt=retries=5"],
+}
+PACMAN_CONF = "/etc/pacman.conf"
+PACMAN_MIRRORLIST_INCLUDE = "Include = /etc/pacman.d/mirrorlist"
+
+def write_tuned_pacman_conf(path, mirror=None):
+    """
+    Writes a copy of pacman.conf with ParallelDownloads set in the [options] section
+    and, if a mirror was selected (see utils/mirror_selector.py), the mirrorlist replaced by it.
+    """
+    with open(PACMAN_CONF, "r") as f:
+        lines = f.read().splitlines()
+    section = None
+    tuned = []
+    for line in lines:
+        stripped = line.strip()
+        if mirror and stripped.replace(" ", "") == PACMAN_MIRRORLIST_INCLUDE.replace(" ", ""):
+            tuned.append(utils.mirror_selector.get_pacman_server(mirror))
+            continue
+        if stripped.startswith("["):
+            if section == "[options]":
+                tuned.append(f"ParallelDownloads = {PARALLEL_DOWNLOADS}")
+            section = stripped
+        if section == "[options]" and stripped.lstrip("#").split("=")[0].strip() == "ParallelDownloads":
+            continue
+        tuned.append(line)
+    if section == "[options]":
+        tuned.append(f"ParallelDownloads = {PARALLEL_DOWNLOADS}")
+    with open(path, "w") as f:
+        f.write("\n".join(tuned) + "\n")
+
+@contextmanager
+def tuned_package_manager(manager, mirror=None):
+    """
+    Yields the arguments that apply the tuned download settings (and the selected mirror)
+    to 'manager' commands. Temporary files are removed afterwards.
+    """
+    tuning = list(PACKAGE_MANAGER_TUNING.get(manager, []))
+    tmpdir = tempfile.mkdtemp(prefix="autoinstaller-packages-")
+    os.chmod(tmpdir, 0o755)
+    try:
+        if manager == "apt" and mirror:
+            tuning += utils.mirror_selector.write_apt_sources(mirror, tmpdir)
+        elif manager == "dnf" and mirror:
+            tuning += utils.mirror_selector.get_dnf_options(mirror)
+        elif manager == "pacman" and os.path.exists(PACMAN_CONF):
+            path = os.path.join(tmpdir, "pacman.conf")
+            write_tuned_pacman_conf(path, mirror)
+            os.chmod(path, 0o644)
+            tuning += ["--config", path]
+        yield tuning
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+def tune_command(command, tuning):
+    return [command[0], *tuning, *command[1:]] if command else command
+
+# Repositories some packages come from. They are added before the system package transaction, so
+# their packages are installed in the same transaction as the rest.
+# "packages": The packages of PACKAGE_MAP the repository provides.
+# "add":      add(manager) adds the repository and returns its source file, or None if nothing
+#             was added (already there, or the distro ships the packages itself).
+THIRD_PARTY_REPOSITORIES = [
+    {"name": "VS Code", "packages": utils.vscode_installer.PACKAGES, "add": utils.vscode_installer.add_repository},
+]
+
+def add_repositories(manager, packages):
+    """
+    Adds the third-party repositories the packages need. Returns (new source files,
+    packages whose repository could not be added and that must be left out).
+    """
+    sources, unavailable = [], []
+    for repository in THIRD_PARTY_REPOSITORIES:
+        if not set(repository["packages"]) & set(packages):
+            continue
+        try:
+            source = repository["add"](manager)
+            if source:
+                sources.append(source)
+        except Exception as e:
+            print(f"WARNING: Could not add the {repository['name']} repository ({e}). Skipping {', '.join(repository['packages'])}.")
+            unavailable.extend(repository["packages"])
+    return sources, unavailable
+
+def get_source_refresh_commands(manager, sources):
+    """
+    Returns the commands that refresh only the given sources (apt), or [] if the
+    package manager fetches the metadata of new repositories by itself (dnf, pacman).
+    """
+    if manager != "apt":
+        return []
+    # Dir::Etc::SourceParts=- disables the other source files; the lists of the other
+    # sources are kept (List-Cleanup=0). Each source is refreshed separately.
+    return [["apt-get", "update", "-o", f"Dir::Etc::SourceList={source}", "-o", "Dir::Etc::SourceParts=-",
+             "-o", "APT::Get::List-Cleanup=0"] for source in sources]
+
+def get_packages(config, tags=None):
+    """
+    Returns the base packages plus the tagged packages of the selected tags (all if tags is None).
+    """
+    packages = list(config["packages"])
+    for tag, tagged in config.get("tagged_packages", {}).items():
+        if tags is None or tag in tags:
+            packages.extend(tagged)
+    return packages
+
+def get_download_only_command(config, tags=None, exclude=()):
+    """
+    Returns the command that only downloads the packages into the package manager's cache.
+    apt and dnf skip what is installed already; pacman is told to with '--needed'.
+    """
+    manager = config["manager"]
+    packages = [package for package in get_packages(config, tags) if package not in exclude]
+    if manager == "apt": return ["apt-get", "install", "-y", "--download-only", *packages]
+    if manager == "dnf": return ["dnf", "install", "-y", "--downloadonly", *packages]
+    if manager == "pacman": return ["pacman", "-Sw", "--noconfirm", "--needed", *packages]
+    return None
+
+def select_mirror(args):
+    """
+    Probes the mirrors if '--select-mirror' is set. Returns the selected mirror or None.
+    """
+    if not args.select_mirror or platform.system().lower() != "linux":
+        return None
+    try:
+        return utils.mirror_selector.select(candidates=args.mirrors)
+    except Exception as e:
+        print(f"WARNING: Mirror selection failed ({e}). Keeping the configured mirrors.")
+        return None
+
+def prefetch_packages(config, tags=None, mirror=None):
+    """
+    Refreshes the package index and downloads the packages. Returns the package manager
+    if it succeeded, so the install transaction can skip the index refresh.
+    """
+    os.makedirs(os.path.dirname(PREFETCH_LOG), exist_ok=True)
+    try:
+        # The repositories are added first, so the index refresh below includes them.
+        _, unavailable = add_repositories(config["manager"], get_packages(config, tags))
+        with open(PREFETCH_LOG, "w") as log, tuned_package_manager(config["manager"], mirror) as tuning:
+            update_command = config.get("prefetch_update_cmd", config["update_cmd"])
+            for command in ([update_command] if update_command else []) + [get_download_only_command(config, tags, unavailable)]:
+                command = tune_command(command, tuning)
+                log.write(f"\n$ {' '.join(command)}\n"); log.flush()
+                utils.privileged_helper.run("packages", argv=command, stdout=log, stderr=subprocess.STDOUT, check=True)
+        print("\nPackage downloads finished in the background.")
+        return config["manager"]
+    except Exception as e:
+        print(f"\nWARNING: Background package download failed ({e}), see {PREFETCH_LOG}. "
+              "The install transaction downloads them instead.")
+        return None
+
+def start_package_prefetch(tags=None, mirror=None):
+    """
+    Starts downloading the system packages in the background, so the bootstrap steps run
+    while they download and the install transaction only unpacks from the local cache.
+    The distro is not known yet ('distro' may not be installed), so the package manager
+    is picked by which one exists. Returns a future, or None if nothing was started.
+    """
+    if platform.system().lower() != "linux":
+        return None
+    config = next((config for config in PACKAGE_MAP.values() if shutil.which(config["manager"])), None)
+    if not config or not get_download_only_command(config):
+        return None
+    # Without the helper, sudo could prompt for a password from the background thread.
+    if not utils.privileged_helper.is_running():
+        print("WARNING: The privileged helper is not running. Packages are downloaded during the install instead.")
+        return None
+    print(f"\n--- Downloading system packages with '{config['manager']}' in the background ---")
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(prefetch_packages, config, tags, mirror)
+    executor.shutdown(wait=False)
+    return future
+
+def install_system_packages(prefetch=None, tags=None, mirror=None):
     print("\n--- Installing System Packages ---")
     system_id = get_system_info()
     if system_id in ["linuxmint", "ubuntu"]: system_id = "debian"
@@ -110,63 +327,492 @@ def install_system_packages():
     config = PACKAGE_MAP[system_id]
     manager = config["manager"]
     is_linux = platform.system().lower() == "linux"
+    index_refreshed = False
+    if prefetch:
+        print("Waiting for the background package download to finish...")
+        index_refreshed = prefetch.result() == manager
     try:
-        if config["update_cmd"]:
-            subprocess.run((["sudo"] if is_linux else []) + config["update_cmd"], check=True, capture_output=True, text=True)
-        command = (["sudo"] if is_linux else []) + [manager]
-        if manager in ["apt", "dnf"]: command.extend(["install", "-y"])
-        elif manager == "pacman": command.extend(["-S", "--noconfirm"])
-        else: command.append("install")
-        command.extend(config["packages"])
-        print(f"Running installation: {' '.join(command)}")
-        subprocess.run(command, check=True)
+        if is_linux:
+            run = lambda command, **options: utils.privileged_helper.run("packages", argv=command, **options)
+        else:
+            run = functools.partial(subprocess.run, text=True)
+        packages = get_packages(config, tags)
+        new_sources, unavailable = add_repositories(manager, packages) if is_linux else ([], [])
+        with tuned_package_manager(manager, mirror) as tuning:
+            if config["update_cmd"] and (not index_refreshed or "prefetch_update_cmd" in config):
+                # The full refresh includes the repositories added above. A prefetched upgrade
+                # was only downloaded, so it still runs here (from the cache).
+                run(tune_command(config["update_cmd"], tuning), check=True, capture_output=True)
+            else:
+                for refresh in get_source_refresh_commands(manager, new_sources):
+                    run(tune_command(refresh, PACKAGE_MANAGER_TUNING.get(manager, [])), check=True, capture_output=True)
+            command = [manager, *tuning]
+            if manager in ["apt", "dnf"]: command.extend(["install", "-y"])
+            elif manager == "pacman": command.extend(["-S", "--noconfirm"])
+            else: command.append("install")
+            command.extend(package for package in packages if package not in unavailable)
+            print(f"Running installation: {' '.join(command)}")
+            run(command, check=True)
         print("\nSystem packages installed successfully!"); return True
     except Exception as e: print(f"\nERROR: Package installation failed. Reason: {e}"); return False
 
-def install_ffuf():
-    print("\n--- Installing 'ffuf' from source ---")
-    if shutil.which('ffuf'): print("'ffuf' is already installed. Skipping."); return
-    if not all(shutil.which(cmd) for cmd in ['git', 'go']): return
-    with tempfile.TemporaryDirectory() as tmpdir:
-        try:
-            ffuf_path = os.path.join(tmpdir, "ffuf")
-            subprocess.run(["git", "clone", "--depth", "1", "https://github.com/ffuf/ffuf", ffuf_path], check=True, capture_output=True)
-            subprocess.run(["go", "build"], cwd=ffuf_path, check=True, capture_output=True)
-            local_bin = os.path.expanduser("~/.local/bin")
-            os.makedirs(local_bin, exist_ok=True)
-            shutil.move(os.path.join(ffuf_path, "ffuf"), local_bin)
-            print("'ffuf' installed successfully.")
-        except Exception as e: print(f"\nAn error occurred during 'ffuf' installation: {e}")
+def get_packages_fingerprint(tags=None):
+    """
+    Identifies the package lists and selected tags, so a journaled package step is redone when they change.
+    """
+    return hashlib.sha256(repr((sorted(PACKAGE_MAP.items()), tags)).encode()).hexdigest()[:16]
 
 def configure_shells():
     utils.bash_configurator.configure()
     utils.zsh_configurator.configure()
+    utils.tmux_configurator.configure()
+
+def recipe_installer(name, tags):
+    """
+    Returns the registry entry of a tool built by utils.source_builder from its recipe.
+    """
+    recipe = utils.source_builder.get_recipe(name)
+    entry = {"name": name, "install": functools.partial(utils.source_builder.install, name), "repo": recipe["repo"],
+             "tags": tags}
+    install_dir = utils.source_builder.get_install_dir(recipe)
+    if install_dir:
+        entry["check_path"] = str(install_dir / utils.versioned_install.CURRENT_LINK)
+        entry["install_dir"] = install_dir
+    else:
+        entry["check_command"] = recipe["check_command"]
+    return entry
+
+def cargo_installer(name, tags):
+    """
+    Returns the registry entry of a Rust tool built by utils.cargo_builder.
+    """
+    tool = utils.cargo_builder.get_tool(name)
+    return {"name": name, "install": functools.partial(utils.cargo_builder.install, name),
+            "check_path": str(utils.cargo_builder.get_binary_path(name)), "repo": tool["repo"], "tags": tags}
+
+def go_installer(name, tags):
+    """
+    Returns the registry entry of a Go tool built by utils.go_builder.
+    """
+    tool = utils.go_builder.get_tool(name)
+    return {"name": name, "install": functools.partial(utils.go_builder.install, name),
+            "check_command": tool["binary"], "repo": tool["repo"], "tags": tags}
+
+# --- INSTALLER REGISTRY ---
+# The individual installers, in the order they are run.
+# "check_command" / "check_path" work like in command_runner and tell whether the tool is present.
+# "repo" marks tools built from a git source; update mode rebuilds them when upstream HEAD moves.
+# "install_dir" marks tools with a versioned /opt/<tool>/<version> layout that can be rolled back.
+# "tags" selects the installer by role (see utils/tool_profiles.py). Installers without
+# "tags" run for every profile and filter their own tools by the tags passed to them.
+# Tools built from source with configure/make are recipes in utils.source_builder.
+INSTALLERS = [
+    {"name": "vscode", "install": utils.vscode_installer.install, "check_command": "code", "tags": ["desktop"]},
+    {"name": "docker", "install": utils.docker_installer.install, "check_command": "docker", "tags": ["base"]},
+    recipe_installer("nmap", tags=["base"]),
+    recipe_installer("rlwrap", tags=["base"]),
+    {"name": "sqlmap", "install": utils.sqlmap_installer.install, "check_path": "/opt/sqlmap/current",
+     "repo": utils.sqlmap_installer.REPO_URL, "install_dir": utils.sqlmap_installer.INSTALL_DIR, "tags": ["web"]},
+    recipe_installer("proxychains", tags=["base"]),
+    {"name": "commands", "install": utils.command_runner.install},
+    cargo_installer("rusthound", tags=["ad"]),
+    go_installer("ffuf", tags=["web"]),
+    go_installer("fzf", tags=["base"]),
+    recipe_installer("tmux", tags=["base"]),
+    recipe_installer("xclip", tags=["desktop"]),
+    {"name": "ghidra", "install": utils.ghidra_installer.install, "check_path": "/opt/ghidra/current",
+     "install_dir": utils.ghidra_installer.INSTALL_DIR, "tags": ["re"]},
+    recipe_installer("john", tags=["cracking"]),
+    recipe_installer("hashcat", tags=["cracking"]),
+    {"name": "uv-tools", "install": utils.uv_tools_installer.install},
+]
+
+# Prefix of the machine-readable status lines printed after each installer (parsed by fleet mode).
+STATUS_PREFIX = "[status]"
+
+def is_tool_present(entry):
+    if entry.get("check_path"):
+        return os.path.exists(entry["check_path"])
+    if entry.get("check_command"):
+        return shutil.which(entry["check_command"]) is not None
+    return None
+
+def migrate_legacy_installs(selected):
+    """
+    Moves old flat /opt/<tool> installations of the selected tools to the versioned layout,
+    so they count as installed and the 'current' link the shell configuration uses exists.
+    """
+    for entry in INSTALLERS:
+        if entry["name"] in selected and entry.get("install_dir"):
+            try:
+                utils.versioned_install.migrate_legacy(entry["install_dir"])
+            except Exception as e:
+                print(f"WARNING: Could not migrate {entry['install_dir']} to the versioned layout: {e}")
+
+def run_installers(selected, options):
+    """
+    Runs the selected installers in registry order and returns a {name: status} dict.
+    Status is 'present' (already there), 'installed', 'failed' or 'done' (no check).
+    Installers that completed in an interrupted earlier run (see run_journal) are not run again.
+    Only 'present' and 'installed' are journaled: installers without a check ('done') handle
+    several tools and only report their failures, and they skip what is there by themselves.
+    """
+    results = {}
+    for entry in INSTALLERS:
+        name = entry["name"]
+        if name not in selected:
+            continue
+        journaled = utils.run_journal.get(f"installer:{name}")
+        if journaled:
+            print(f"\n'{name}' completed in a previous run. Skipping.")
+            utils.event_stream.emit("skip", stage=f"installer:{name}", reason="journaled")
+            results[name] = journaled["status"]
+            print(f"{STATUS_PREFIX} {name}: {results[name]}", flush=True)
+            continue
+        was_present = is_tool_present(entry)
+        with utils.event_stream.stage(f"installer:{name}") as stage:
+            try:
+                entry["install"](**options.get(name, {}))
+            except Exception as e:
+                print(f"\nAn unexpected error occurred in the '{name}' installer: {e}")
+                utils.event_stream.emit("error", stage=f"installer:{name}", message=str(e))
+            is_present = is_tool_present(entry)
+            if was_present:
+                status = "present"
+                utils.event_stream.emit("skip", stage=f"installer:{name}", reason="already present")
+            elif is_present is None:
+                status = "done"
+            else:
+                status = "installed" if is_present else "failed"
+            stage["status"] = status
+        if status in ("present", "installed"):
+            utils.run_journal.put(f"installer:{name}", {"status": status})
+        results[name] = status
+        print(f"{STATUS_PREFIX} {name}: {status}", flush=True)
+    return results
+
+def run_update(selected, options, tags=None):
+    """
+    Queries the upstream HEAD of every installed git-sourced tool concurrently and
+    rebuilds only the ones whose recorded commit differs. Returns a {name: status} dict.
+    """
+    print("\n--- Checking upstream sources for updates ---")
+    uv_tools = utils.uv_tools_installer
+    sources = {}
+    for entry in INSTALLERS:
+        if entry["name"] in selected and entry.get("repo") and is_tool_present(entry):
+            sources[entry["name"]] = entry["repo"]
+    if "uv-tools" in selected:
+        for tool in uv_tools.UV_TOOLS:
+            if utils.tool_profiles.is_selected(tool, tags) and shutil.which(tool["check_name"]):
+                sources[uv_tools.get_state_name(tool)] = tool["url"]
+
+    outdated = utils.version_tracker.find_outdated(sources)
+    if not outdated:
+        print("\nEverything is up to date."); return {}
+
+    results = {}
+    for entry in INSTALLERS:
+        name = entry["name"]
+        if name not in outdated:
+            continue
+        with utils.event_stream.stage(f"update:{name}") as stage:
+            try:
+                entry["install"](force=True, **options.get(name, {}))
+            except Exception as e:
+                print(f"\nAn unexpected error occurred in the '{name}' installer: {e}")
+                utils.event_stream.emit("error", stage=f"update:{name}", message=str(e))
+            results[name] = "updated" if utils.version_tracker.get_installed_commit(name) == outdated[name] else "failed"
+            stage["status"] = results[name]
+        print(f"{STATUS_PREFIX} {name}: {results[name]}", flush=True)
+
+    packages = [tool["package"] for tool in uv_tools.UV_TOOLS if uv_tools.get_state_name(tool) in outdated]
+    if packages:
+        uv_tools.install(force=True, packages=packages, **options.get("uv-tools", {}))
+        for tool in uv_tools.UV_TOOLS:
+            name = uv_tools.get_state_name(tool)
+            if name in outdated:
+                results[name] = "updated" if utils.version_tracker.get_installed_commit(name) == outdated[name] else "failed"
+                print(f"{STATUS_PREFIX} {name}: {results[name]}", flush=True)
+    return results
+
+def get_staged_preserve(name):
+    """
+    Returns the config files a staged install of the tool must keep, or None if it is not a staged install.
+    """
+    recipe = next((recipe for recipe in utils.source_builder.RECIPES if recipe["name"] == name), None)
+    if not recipe or not recipe.get("install"):
+        return None
+    return recipe.get("config_files", [])
+
+def run_rollback(selected):
+    """
+    Switches every selected tool with a versioned install directory back to its previous version,
+    and re-installs the previous staged tree of tools installed into a prefix.
+    """
+    print("\n--- Rolling back to the previous versions ---")
+    results = {}
+    for entry in INSTALLERS:
+        preserve = get_staged_preserve(entry["name"])
+        if entry["name"] not in selected or (not entry.get("install_dir") and preserve is None):
+            continue
+        print(f"\nProcessing: {entry['name']}")
+        try:
+            if entry.get("install_dir"):
+                previous = utils.versioned_install.rollback(entry["install_dir"])
+                if previous:
+                    utils.version_tracker.record_rollback(entry["name"], previous)
+            else:
+                previous = utils.staged_install.rollback(entry["name"], preserve)
+            results[entry["name"]] = "rolled-back" if previous else "unchanged"
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: Rollback of '{entry['name']}' failed: {e}")
+            results[entry["name"]] = "failed"
+        print(f"{STATUS_PREFIX} {entry['name']}: {results[entry['name']]}", flush=True)
+    return results
+
+def run_uninstall(selected):
+    """
+    Removes the files of every selected tool installed through a staged install, using its manifest.
+    """
+    print("\n--- Uninstalling ---")
+    results = {}
+    for entry in INSTALLERS:
+        preserve = get_staged_preserve(entry["name"])
+        if entry["name"] not in selected or preserve is None:
+            continue
+        print(f"\nProcessing: {entry['name']}")
+        try:
+            results[entry["name"]] = "removed" if utils.staged_install.uninstall(entry["name"], preserve) else "unchanged"
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: Uninstalling '{entry['name']}' failed: {e}")
+            results[entry["name"]] = "failed"
+        print(f"{STATUS_PREFIX} {entry['name']}: {results[entry['name']]}", flush=True)
+    return results
+
+def run_benchmarks(results):
+    """
+    Benchmarks John the Ripper and Hashcat if this run built them.
+    """
+    tools = [name for name in ("john", "hashcat") if results.get(name) in ("installed", "updated")]
+    if tools:
+        utils.cracking_benchmark.run(tools)
+
+def get_installer_options(args, tags):
+    """
+    Returns the keyword arguments passed to each installer, keyed by installer name.
+    """
+    return {
+        "john": {"profile": args.build_profile},
+        "hashcat": {"profile": args.build_profile, "prewarm": args.prewarm_kernels},
+        "commands": {"tags": tags},
+        "uv-tools": {"wheelhouse": args.wheelhouse, "tags": tags, "shared_layers": args.uv_shared_layers},
+        "ghidra": {"tuning": args.ghidra_tuning},
+    }
+
+def get_selected_installers(args, tags):
+    """
+    Returns the names of the installers to run: those matching the tags, limited by '--only'.
+    """
+    return [entry["name"] for entry in INSTALLERS
+            if utils.tool_profiles.is_selected(entry, tags) and (not args.only or entry["name"] in args.only)]
+
+def parse_installer_list(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    known = [entry["name"] for entry in INSTALLERS]
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown installer(s): {', '.join(unknown)} (choose from {', '.join(known)})")
+    return names
+
+
+def parse_key_values(value):
+    """
+    argparse type for 'key=value,key=value'.
+    """
+    settings = {}
+    for item in value.split(","):
+        key, separator, setting = item.partition("=")
+        if not separator or not key.strip():
+            raise argparse.ArgumentTypeError(f"expected key=value, got '{item}'")
+        settings[key.strip()] = setting.strip()
+    return settings
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Provision this machine with the pentest toolchain.")
+    parser.add_argument("mode", nargs="?", default="install", choices=["install", "update", "rollback", "uninstall", "wheelhouse", "fleet", "verify"],
+                        help="'install' (default) provisions this machine; 'update' rebuilds only the "
+                             "installed tools whose upstream commit changed; 'rollback' switches the "
+                             "versioned tools under /opt (and the staged installs in /usr/local) back to their previous "
+                             "version; 'uninstall' removes the staged installs selected with '--only'; 'wheelhouse' only builds "
+                             "wheels for the uv tools into the wheelhouse directory; 'fleet' provisions "
+                             "every host of an inventory over SSH; 'verify' smoke-tests every managed tool.")
+    parser.add_argument("--wheelhouse", metavar="DIR", nargs="?", const=str(utils.uv_tools_installer.WHEELHOUSE_DIR),
+                        help="Wheelhouse directory used to build or install the uv tools "
+                             f"(default: {utils.uv_tools_installer.WHEELHOUSE_DIR}).")
+    parser.add_argument("--uv-shared-layers", action="store_true",
+                        help="Install the uv tools that share a \"layer\" (e.g. the AD tools around impacket) into one "
+                             "environment resolved together, instead of one environment per tool.")
+    parser.add_argument("--build-profile", choices=list(utils.build_profiles.BUILD_PROFILES),
+                        default=utils.build_profiles.DEFAULT_PROFILE,
+                        help="Compiler tuning for John the Ripper and Hashcat: 'generic' (portable), "
+                             "'native' (-march=native) or 'max' (native + -O3, LTO, OpenMP for fast formats).")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="After installing or updating John the Ripper / Hashcat, benchmark them and "
+                             "compare the result with the previous build.")
+    parser.add_argument("--prewarm-kernels", action="store_true",
+                        help="Compile Hashcat's OpenCL kernels for the common modes at install time.")
+    parser.add_argument("--prefetch-packages", action="store_true",
+                        help="Download the system packages in the background while the bootstrap steps run, "
+                             "so the package manager only unpacks from its cache afterwards.")
+    parser.add_argument("--select-mirror", action="store_true",
+                        help="Probe the distro's mirrors before installing the system packages and use the "
+                             "fastest one for this run (see utils/mirror_selector.py).")
+    parser.add_argument("--mirrors", metavar="URLS", type=lambda value: [url.strip() for url in value.split(",") if url.strip()],
+                        help="Comma-separated mirror URLs probed by '--select-mirror' instead of the built-in candidates.")
+    parser.add_argument("--artifact-store", metavar="LOCATION",
+                        help="Directory or http(s):// URL of a shared store of built tools: builds found there are "
+                             "downloaded instead of compiled, local builds are published to it "
+                             f"(default: ${utils.artifact_store.ENV_VAR}).")
+    parser.add_argument("--ghidra-tuning", metavar="SETTINGS", type=parse_key_values, default={},
+                        help="Override Ghidra's JVM settings, which are otherwise sized from RAM and cores: comma-separated "
+                             "'maxmem=24G', 'gc=serial|parallel|g1|zgc', 'threads=N'.")
+    parser.add_argument("--json", action="store_true",
+                        help="Verify mode: print the report as JSON instead of a table.")
+    parser.add_argument("--events", metavar="TARGET",
+                        help="Also write progress events as JSON lines to TARGET, a file or 'unix:/path/to/socket' "
+                             f"(default: ${utils.event_stream.ENV_VAR}). See utils/event_stream.py for the schemas.")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Ignore the journal of an interrupted run and start from scratch.")
+    parser.add_argument("--profile", choices=list(utils.tool_profiles.PROFILES), default=utils.tool_profiles.DEFAULT_PROFILE,
+                        help="Role of this machine; only the installers, tools and packages tagged for it are "
+                             f"installed (default: {utils.tool_profiles.DEFAULT_PROFILE}).")
+    parser.add_argument("--tags", metavar="TAGS", type=utils.tool_profiles.parse_tags, default=[],
+                        help=f"Comma-separated tags to add to the profile ({', '.join(utils.tool_profiles.TAGS)}).")
+    parser.add_argument("--exclude-tags", metavar="TAGS", type=utils.tool_profiles.parse_tags, default=[],
+                        help="Comma-separated tags to remove from the profile.")
+    parser.add_argument("--only", metavar="NAMES", type=parse_installer_list,
+                        help="Comma-separated list of installers to run (default: all).")
+    parser.add_argument("--inventory", metavar="FILE",
+                        help="Fleet mode: file with one '[user@]host[:port]' per line.")
+    parser.add_argument("--jobs", metavar="N", type=int, default=utils.fleet_manager.DEFAULT_JOBS,
+                        help=f"Fleet mode: number of hosts provisioned concurrently (default: {utils.fleet_manager.DEFAULT_JOBS}).")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    ensure_pip_is_available()
-    ensure_uv()
-    install_script_dependencies_with_pip()
+    args = parse_args()
+    tags = utils.tool_profiles.resolve(args.profile, args.tags, args.exclude_tags)
+    selected = get_selected_installers(args, tags)
+    utils.event_stream.configure(args.events)
+    utils.artifact_store.configure(args.artifact_store)
+    utils.event_stream.emit("run_start", mode=args.mode, installers=selected)
+    run_started = time.monotonic()
+
+    if args.mode == "fleet":
+        if not args.inventory:
+            print("ERROR: Fleet mode requires '--inventory FILE'."); sys.exit(1)
+        remote_args = ["install", "--profile", args.profile]
+        if args.tags:
+            remote_args += ["--tags", ",".join(args.tags)]
+        if args.exclude_tags:
+            remote_args += ["--exclude-tags", ",".join(args.exclude_tags)]
+        if args.only:
+            remote_args += ["--only", ",".join(args.only)]
+        if args.wheelhouse:
+            remote_args += ["--wheelhouse", args.wheelhouse]
+        remote_args += ["--build-profile", args.build_profile]
+        if args.uv_shared_layers:
+            remote_args.append("--uv-shared-layers")
+        if args.benchmark:
+            remote_args.append("--benchmark")
+        if args.prewarm_kernels:
+            remote_args.append("--prewarm-kernels")
+        if args.fresh:
+            remote_args.append("--fresh")
+        if args.prefetch_packages:
+            remote_args.append("--prefetch-packages")
+        if args.select_mirror:
+            remote_args.append("--select-mirror")
+        if args.mirrors:
+            remote_args += ["--mirrors", ",".join(args.mirrors)]
+        if args.artifact_store:
+            remote_args += ["--artifact-store", args.artifact_store]
+        if args.ghidra_tuning:
+            remote_args += ["--ghidra-tuning", ",".join(f"{key}={value}" for key, value in args.ghidra_tuning.items())]
+        hosts = utils.fleet_manager.load_inventory(args.inventory)
+        results = utils.fleet_manager.provision(hosts, remote_args, jobs=args.jobs)
+        # An empty inventory provisions nothing, which is a failure too
+        sys.exit(0 if results and all(result["ok"] for result in results.values()) else 1)
+
+    if args.mode == "verify":
+        report = utils.health_check.verify(selected, tags)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            utils.health_check.print_report(report)
+        failed = [result["name"] for result in report if result["status"] != "pass"]
+        utils.event_stream.emit("run_finish", status="failed" if failed else "ok", failed=failed,
+                                seconds=round(time.monotonic() - run_started, 3))
+        sys.exit(0 if utils.health_check.is_healthy(report) else 1)
+
+    if args.mode in ("install", "update", "rollback", "uninstall"):
+        # One sudo authentication for the whole run (see utils/privileged_helper.py)
+        utils.privileged_helper.start()
+        migrate_legacy_installs(selected)
+
+    if args.mode == "update":
+        results = run_update(selected, get_installer_options(args, tags), tags)
+        if args.benchmark:
+            run_benchmarks(results)
+        failed = [name for name, status in results.items() if status == "failed"]
+        utils.event_stream.emit("run_finish", status="failed" if failed else "ok", failed=failed,
+                                seconds=round(time.monotonic() - run_started, 3))
+        sys.exit(1 if "failed" in results.values() else 0)
+
+    if args.mode == "rollback":
+        results = run_rollback(selected)
+        failed = [name for name, status in results.items() if status == "failed"]
+        utils.event_stream.emit("run_finish", status="failed" if failed else "ok", failed=failed,
+                                seconds=round(time.monotonic() - run_started, 3))
+        sys.exit(1 if "failed" in results.values() else 0)
+
+    if args.mode == "uninstall":
+        if not args.only:
+            print("ERROR: Uninstall mode requires '--only NAMES'."); sys.exit(1)
+        results = run_uninstall(selected)
+        failed = [name for name, status in results.items() if status == "failed"]
+        utils.event_stream.emit("run_finish", status="failed" if failed else "ok", failed=failed,
+                                seconds=round(time.monotonic() - run_started, 3))
+        sys.exit(1 if failed else 0)
+
+    if args.fresh:
+        for recipe in utils.source_builder.RECIPES:
+            utils.source_builder.discard_resume_state(recipe["name"])
+        utils.run_journal.clear()
+
+    prefetch = mirror = None
+    if args.mode == "install" and not utils.run_journal.is_done("stage:system-packages", get_packages_fingerprint(tags)):
+        mirror = select_mirror(args)
+        if args.prefetch_packages:
+            prefetch = start_package_prefetch(tags, mirror)
+
+    utils.run_journal.run_step("stage:pip", ensure_pip_is_available)
+    utils.run_journal.run_step("stage:uv", ensure_uv)
+
+    if args.mode == "wheelhouse":
+        wheelhouse = args.wheelhouse or utils.uv_tools_installer.WHEELHOUSE_DIR
+        sys.exit(0 if utils.uv_tools_installer.build_wheelhouse(wheelhouse) else 1)
+
+    utils.run_journal.run_step("stage:script-deps", install_script_dependencies_with_pip)
     
-    if not install_system_packages():
+    if not utils.run_journal.run_step("stage:system-packages", lambda: install_system_packages(prefetch, tags, mirror), get_packages_fingerprint(tags)):
         sys.exit(1)
         
     # Run all the individual installers
-    utils.vscode_installer.install()
-    utils.docker_installer.install()
-    utils.nmap_installer.install()
-    utils.rlwrap_installer.install()
-    utils.sqlmap_installer.install()
-    utils.proxychains_installer.install()
-    utils.command_runner.install()
-    install_ffuf()
-    utils.fzf_installer.install()
-    utils.tmux_installer.install()
-    utils.xclip_installer.install()
-    utils.ghidra_installer.install()
-    utils.john_installer.install()
-    utils.hashcat_installer.install()
-    utils.uv_tools_installer.install()
+    results = run_installers(selected, get_installer_options(args, tags))
+    if args.benchmark:
+        run_benchmarks(results)
     
     # Configure shells and services at the very end
     configure_shells()
@@ -174,3 +820,11 @@ if __name__ == "__main__":
     utils.service_manager.disable_startup_services()
     
     print("\nAutomation script finished!")
+    failed = [name for name, status in results.items() if status == "failed"]
+    if failed:
+        print(f"WARNING: These installers did not complete: {', '.join(failed)}")
+        print("Re-run the script to resume; completed steps are skipped (use '--fresh' to redo everything).")
+    else:
+        utils.run_journal.clear()
+    utils.event_stream.emit("run_finish", status="failed" if failed else "ok", failed=failed,
+                            seconds=round(time.monotonic() - run_started, 3))
@@ -3,8 +3,14 @@ from pathlib import Path
 # Define all aliases to be managed here.
 # The `cd -` returns you to your original directory after the command runs.
 ALIASES = {
-    "john": "alias john='/opt/john/john'",
-    "hashcat": "alias hashcat='/opt/hashcat/hashcat'"
+    "john": "alias john='/opt/john/current/john'",
+    "hashcat": "alias hashcat='/opt/hashcat/current/hashcat'"
+}
+
+# Aliases written for the old flat /opt layout, replaced by the versioned ones above.
+LEGACY_ALIASES = {
+    "alias john='/opt/john/john'": ALIASES["john"],
+    "alias hashcat='/opt/hashcat/hashcat'": ALIASES["hashcat"],
 }
 
 def configure():
@@ -21,6 +27,16 @@ def configure():
     except FileNotFoundError:
         content = ""
 
+    # Point aliases of the old flat layout at the 'current' symlinks
+    migrated = content
+    for old, new in LEGACY_ALIASES.items():
+        migrated = migrated.replace(old, new)
+    if migrated != content:
+        with open(aliases_path, "w") as f:
+            f.write(migrated)
+        content = migrated
+        print("~/.bash_aliases was migrated to the versioned /opt layout.")
+
     lines_to_add = []
 
     # Check each alias we want to manage
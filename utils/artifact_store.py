@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from utils import event_stream
+
+# --- CONFIGURATION ---
+# Shared store of built tools, so one host of a fleet compiles a tool and the others download it.
+# Enabled with 'main.py --artifact-store LOCATION' (or the AUTOINSTALLER_ARTIFACT_STORE environment
+# variable), where LOCATION is a directory (e.g. an NFS share) or an http(s):// URL. Over HTTP,
+# artifacts are fetched with GET and published with PUT; a read-only server only serves them.
+#
+# Layout:
+#   keys/<aa>/<key>.json        What was built: {"tool", "commit", "platform", "inputs", "object", "size", ...}.
+#                               <key> is the sha256 of tool, commit, platform and build inputs.
+#   objects/<aa>/<sha256>.tar.gz The built files, addressed by the sha256 of the archive itself,
+#                               so identical builds are stored once and downloads are verified.
+ENV_VAR = "AUTOINSTALLER_ARTIFACT_STORE"
+
+HTTP_TIMEOUT = 60
+
+_location = None
+
+def configure(location=None):
+    """
+    Selects the store. Without a location, the environment variable is used;
+    if neither is set, the store is disabled.
+    """
+    global _location
+    _location = location or os.environ.get(ENV_VAR) or None
+
+def is_enabled():
+    return _location is not None
+
+def is_http():
+    return _location.startswith(("http://", "https://"))
+
+def get_platform():
+    """
+    Returns the properties of this machine that a binary depends on.
+    """
+    os_release = {}
+    try:
+        with open("/etc/os-release", "r") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                os_release[key] = value.strip('"')
+    except FileNotFoundError:
+        pass
+    return {"distro": os_release.get("ID", platform.system().lower()), "version": os_release.get("VERSION_ID", ""),
+            "arch": platform.machine()}
+
+def make_key(tool, commit, inputs):
+    """
+    Returns the store key of a build: 'inputs' is anything else that changes the result
+    (build commands, flags, options) and must be JSON-serializable.
+    """
+    description = {"tool": tool, "commit": commit, "platform": get_platform(), "inputs": inputs}
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+def get_key_path(key):
+    return f"keys/{key[:2]}/{key}.json"
+
+def get_object_path(sha256):
+    return f"objects/{sha256[:2]}/{sha256}.tar.gz"
+
+def read(path, destination=None):
+    """
+    Returns the content of a store file (or writes it to 'destination'); None if it does not exist.
+    """
+    try:
+        if is_http():
+            source = urllib.request.urlopen(f"{_location.rstrip('/')}/{path}", timeout=HTTP_TIMEOUT)
+        else:
+            source = open(Path(_location) / path, "rb")
+    except FileNotFoundError:
+        return None
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    with source:
+        if destination is None:
+            return source.read()
+        with open(destination, "wb") as f:
+            shutil.copyfileobj(source, f)
+        return destination
+
+def exists(path):
+    if not is_http():
+        return (Path(_location) / path).exists()
+    try:
+        request = urllib.request.Request(f"{_location.rstrip('/')}/{path}", method="HEAD")
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT):
+            return True
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return False
+        raise
+
+def write(path, source_file):
+    """
+    Stores a local file under 'path'. Writes to a directory are atomic.
+    """
+    if is_http():
+        with open(source_file, "rb") as f:
+            request = urllib.request.Request(f"{_location.rstrip('/')}/{path}", data=f, method="PUT",
+                                             headers={"Content-Length": str(os.path.getsize(source_file))})
+            urllib.request.urlopen(request, timeout=HTTP_TIMEOUT).close()
+        return
+    target = Path(_location) / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copyfile(source_file, tmp_file)
+    os.replace(tmp_file, target)
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def fetch(key, destination):
+    """
+    Downloads and unpacks the artifact of 'key' into the directory 'destination'.
+    Returns True on success; a missing or damaged artifact only means building locally.
+    """
+    if not is_enabled():
+        return False
+    try:
+        record = read(get_key_path(key))
+        event_stream.emit("cache", cache="artifact-store", key=key, hit=record is not None)
+        if record is None:
+            return False
+        record = json.loads(record)
+        print(f"Fetching '{record['tool']}' ({record['commit'][:12]}) from the artifact store...")
+        start = time.monotonic()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "artifact.tar.gz"
+            if read(get_object_path(record["object"]), archive) is None:
+                print(f"WARNING: Artifact object {record['object'][:12]} is missing from the store.")
+                return False
+            if file_hash(archive) != record["object"]:
+                print("WARNING: The downloaded artifact does not match its checksum. Building locally.")
+                return False
+            event_stream.emit("download", url=get_object_path(record["object"]), bytes=archive.stat().st_size,
+                              seconds=round(time.monotonic() - start, 3))
+            shutil.rmtree(destination, ignore_errors=True)
+            Path(destination).mkdir(parents=True)
+            subprocess.run(["tar", "-C", str(destination), "-xzf", str(archive)], check=True, capture_output=True)
+        return True
+    except Exception as e:
+        print(f"WARNING: Could not fetch from the artifact store ({e}). Building locally.")
+        return False
+
+def publish(key, source_dir, tool, commit, inputs):
+    """
+    Packs 'source_dir' and publishes it under 'key'. Failures are only reported.
+    """
+    if not is_enabled():
+        return
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "artifact.tar.gz"
+            # Sorted entries and no timestamp in the gzip header keep the archive stable for the same files
+            subprocess.run(["tar", "-C", str(source_dir), "--exclude=./.git", "--sort=name", "-cf", str(archive.with_suffix("")), "."],
+                           check=True, capture_output=True)
+            subprocess.run(["gzip", "-n", "-f", str(archive.with_suffix(""))], check=True, capture_output=True)
+            sha256 = file_hash(archive)
+            if not exists(get_object_path(sha256)):
+                write(get_object_path(sha256), archive)
+            record_file = Path(tmpdir) / "record.json"
+            record_file.write_text(json.dumps({
+                "tool": tool, "commit": commit, "platform": get_platform(), "inputs": inputs,
+                "object": sha256, "size": archive.stat().st_size,
+                "published_at": int(time.time()), "host": socket.gethostname(),
+            }, indent=2, sort_keys=True))
+            write(get_key_path(key), record_file)
+        print(f"Published '{tool}' to the artifact store.")
+    except Exception as e:
+        print(f"WARNING: Could not publish '{tool}' to the artifact store: {e}")
@@ -3,6 +3,12 @@ import os
 import shutil
 from pathlib import Path
 
+# PATH entries of the old flat /opt layout and their versioned replacements.
+LEGACY_PATHS = {
+    "/opt/hashcat/tools": "/opt/hashcat/current/tools",
+    "/opt/john:": "/opt/john/current:",
+}
+
 def configure():
     """
     Configures ~/.bashrc by replacing existing settings or appending them if they don't exist.
@@ -24,6 +30,12 @@ def configure():
             lines[i] = "HISTFILESIZE=0\n"
             hist_found = True
             break
+
+    # Point PATH entries of the old flat layout at the 'current' symlinks
+    for i, line in enumerate(lines):
+        for old, new in LEGACY_PATHS.items():
+            if old in line and new not in line:
+                lines[i] = line = line.replace(old, new)
             
     # --- Pass 2: Append settings that were not found ---
     # Convert back to a single string for easy 'in' checking of multi-line blocks
@@ -33,21 +45,21 @@ def configure():
     # Idempotent PATH check for Hashcat
     hashcat_block = """
 # Add Hashcat to PATH if not already added
-if [[ ":$PATH:" != *":/opt/hashcat/tools:"* ]]; then
-  export PATH="/opt/hashcat/tools:$PATH"
+if [[ ":$PATH:" != *":/opt/hashcat/current/tools:"* ]]; then
+  export PATH="/opt/hashcat/current/tools:$PATH"
 fi
 """
-    if "/opt/hashcat/tools" not in current_content:
+    if "/opt/hashcat/current/tools" not in current_content:
         lines_to_append.append(hashcat_block)
         
     # Idempotent PATH check for John the Ripper
     john_block = """
 # Add John the Ripper to PATH if not already added
-if [[ ":$PATH:" != *":/opt/john:"* ]]; then
-  export PATH="/opt/john:$PATH"
+if [[ ":$PATH:" != *":/opt/john/current:"* ]]; then
+  export PATH="/opt/john/current:$PATH"
 fi
 """
-    if "/opt/john" not in current_content:
+    if "/opt/john/current" not in current_content:
         lines_to_append.append(john_block)
 
     # Add HISTFILESIZE=0 if it was never found to be replaced
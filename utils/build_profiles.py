@@ -0,0 +1,78 @@
+import os
+import platform
+
+# --- CONFIGURATION ---
+# Compiler settings for the CPU-bound cracking tools (John the Ripper, Hashcat).
+# "generic" is a portable build; "native" and "max" tune the binaries to this host's CPU
+# and must not be copied to other machines ("portable": False keeps them out of the artifact store).
+BUILD_PROFILES = {
+    "generic": {
+        "cflags": [],
+        "ldflags": [],
+        "portable": True,
+    },
+    "native": {
+        "cflags": ["-O2", "-march=native", "-mtune=native"],
+        "ldflags": [],
+        "portable": False,
+    },
+    "max": {
+        "cflags": ["-O3", "-march=native", "-mtune=native", "-flto=auto"],
+        "ldflags": ["-flto=auto"],
+        "portable": False,
+    },
+}
+DEFAULT_PROFILE = "generic"
+
+# CPU flags from /proc/cpuinfo, best first.
+SIMD_LEVELS = ["avx512bw", "avx512f", "avx2", "avx", "sse4_2", "sse4_1", "ssse3", "sse2", "asimd", "neon"]
+
+def detect_simd_level():
+    """
+    Returns the best SIMD extension the host CPU supports, or None.
+    """
+    flags = set()
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith(("flags", "Features")):
+                    flags.update(line.split(":", 1)[1].split())
+    except OSError:
+        return None
+    return next((level for level in SIMD_LEVELS if level in flags), None)
+
+def get_profile(name):
+    if name not in BUILD_PROFILES:
+        raise ValueError(f"Unknown build profile '{name}' (choose from {', '.join(BUILD_PROFILES)})")
+    return BUILD_PROFILES[name]
+
+def get_build_env(name):
+    """
+    Returns a copy of the environment with CFLAGS/LDFLAGS for the profile.
+    Hashcat's Makefile reads linker flags from LFLAGS, so that is set as well.
+    """
+    profile = get_profile(name)
+    env = os.environ.copy()
+    if profile["cflags"]:
+        env["CFLAGS"] = " ".join(profile["cflags"])
+    if profile["ldflags"]:
+        env["LDFLAGS"] = env["LFLAGS"] = " ".join(profile["ldflags"])
+    return env
+
+def describe(name):
+    """
+    Returns the details recorded with an installation built with this profile.
+    """
+    profile = get_profile(name)
+    return {
+        "profile": name,
+        "cflags": " ".join(profile["cflags"]),
+        "ldflags": " ".join(profile["ldflags"]),
+        "simd": detect_simd_level(),
+        "arch": platform.machine(),
+    }
+
+if __name__ == "__main__":
+    print(f"Detected SIMD level: {detect_simd_level()}")
+    for profile_name in BUILD_PROFILES:
+        print(f"{profile_name}: {describe(profile_name)}")
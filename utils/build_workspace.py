@@ -0,0 +1,161 @@
+import errno
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# --- CONFIGURATION ---
+# Rough peak disk usage of each build (clone + objects + binaries), in MB.
+BUILD_SPACE_MB = {
+    "nmap": 600,
+    "john": 900,
+    "hashcat": 1300,
+    "tmux": 100,
+    "rlwrap": 50,
+    "proxychains": 30,
+    "xclip": 30,
+    "ghidra": 1800,
+    # The cargo target directory and the Go caches are outside the workspace
+    # (see cargo_builder and go_builder)
+    "rusthound": 100,
+    "ffuf": 100,
+    "fzf": 100,
+}
+DEFAULT_SPACE_MB = 500
+
+# RAM-backed locations tried first. They must be mounted without 'noexec',
+# because the builds run ./configure and friends from the workspace.
+RAM_BUILD_DIRS = ["/dev/shm"]
+
+# Memory that must stay available for the compiler itself after the workspace is filled.
+RAM_HEADROOM_MB = 2048
+
+# Disk locations used when there is not enough free RAM.
+DISK_BUILD_DIRS = [tempfile.gettempdir(), str(Path.home() / ".cache" / "autoinstaller" / "build")]
+
+# Disk location of resumable builds that do not fit in RAM. The temporary directory is a tmpfs
+# on many distros (e.g. Fedora, Arch), so it is not used for them. Resumable builds in RAM
+# survive a crashed or interrupted run but not a reboot; the journal (see run_journal, on disk)
+# then points at a missing workspace and the build starts over.
+RESUMABLE_BUILD_DIR = Path.home() / ".cache" / "autoinstaller" / "build"
+
+WORKSPACE_PREFIX = "autoinstaller-build-"
+
+# Workspaces of resumable builds (see run_journal) are kept until the build completes,
+# so they use a prefix that cleanup_stale() does not touch.
+RESUMABLE_PREFIX = "autoinstaller-resume-"
+
+class NoSpaceError(OSError):
+    def __init__(self, message):
+        super().__init__(errno.ENOSPC, message)
+
+def available_ram_mb():
+    """
+    Returns MemAvailable from /proc/meminfo in MB, or 0 if it cannot be read.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+def free_space_mb(path):
+    return shutil.disk_usage(path).free // (1024 * 1024)
+
+def is_noexec(path):
+    """
+    Returns True if the filesystem holding 'path' is mounted with 'noexec'.
+    """
+    path = os.path.realpath(path)
+    best_mount, best_options = "", []
+    try:
+        with open("/proc/mounts", "r") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 4:
+                    continue
+                mount_point, options = fields[1], fields[3].split(",")
+                if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) >= len(best_mount):
+                    best_mount, best_options = mount_point, options
+    except OSError:
+        return False
+    return "noexec" in best_options
+
+def cleanup_stale(base_dir):
+    """
+    Removes workspaces left behind by runs that died (their owning PID is gone).
+    """
+    base_dir = Path(base_dir)
+    if not base_dir.is_dir():
+        return
+    for entry in base_dir.glob(f"{WORKSPACE_PREFIX}*"):
+        try:
+            pid = int(entry.name[len(WORKSPACE_PREFIX):].split("-")[1])
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            print(f"Removing stale build workspace {entry}...")
+            shutil.rmtree(entry, ignore_errors=True)
+        except (ValueError, IndexError, PermissionError):
+            continue
+
+def choose_base_dir(tool, allow_ram=True, disk_dirs=None):
+    """
+    Picks where to build 'tool': a RAM-backed directory if it fits with headroom,
+    otherwise the first disk location with enough free space.
+    Raises NoSpaceError if nothing is large enough.
+    """
+    needed = BUILD_SPACE_MB.get(tool, DEFAULT_SPACE_MB)
+
+    for base in (RAM_BUILD_DIRS if allow_ram else []):
+        if not os.path.isdir(base) or not os.access(base, os.W_OK) or is_noexec(base):
+            continue
+        cleanup_stale(base)
+        if free_space_mb(base) >= needed and available_ram_mb() - needed >= RAM_HEADROOM_MB:
+            return base
+
+    checked = []
+    for base in (disk_dirs or DISK_BUILD_DIRS):
+        try:
+            os.makedirs(base, exist_ok=True)
+        except OSError:
+            continue
+        cleanup_stale(base)
+        free = free_space_mb(base)
+        checked.append(f"{base} ({free} MB free)")
+        if free >= needed and not is_noexec(base):
+            return base
+
+    raise NoSpaceError(f"Not enough space to build '{tool}': needs ~{needed} MB, checked {', '.join(checked) or 'nothing'}.")
+
+def create(tool, resumable=False):
+    """
+    Creates a build workspace after checking free space. Resumable workspaces
+    survive the process and must be removed with remove().
+    """
+    if resumable:
+        base = choose_base_dir(tool, disk_dirs=[str(RESUMABLE_BUILD_DIR)])
+    else:
+        base = choose_base_dir(tool)
+    prefix = f"{RESUMABLE_PREFIX}{tool}-" if resumable else f"{WORKSPACE_PREFIX}{tool}-{os.getpid()}-"
+    path = tempfile.mkdtemp(prefix=prefix, dir=base)
+    print(f"Using build workspace {path}")
+    return path
+
+def remove(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+@contextmanager
+def workspace(tool):
+    """
+    Drop-in replacement for tempfile.TemporaryDirectory() for source builds.
+    Checks free space before anything is cloned and removes the workspace afterwards.
+    """
+    path = create(tool)
+    try:
+        yield path
+    finally:
+        remove(path)
@@ -0,0 +1,108 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from utils import build_workspace, event_stream, version_tracker
+
+# --- CONFIGURATION ---
+# Rust tools built with 'cargo install'. Add future Rust tools here (and an entry in main.INSTALLERS).
+#
+# "name":         Short name, also used for workspaces and the version tracker.
+# "display_name": A friendly name for logging.
+# "repo":         The git repository, cloned with '--depth 1'.
+# "binary":       The executable cargo installs into ~/.cargo/bin.
+CARGO_TOOLS = [
+    {
+        "name": "rusthound",
+        "display_name": "RustHound",
+        "repo": "https://github.com/NH-RED-TEAM/RustHound.git",
+        "binary": "rusthound",
+    },
+]
+
+CARGO_HOME = Path(os.environ.get("CARGO_HOME", Path.home() / ".cargo"))
+CARGO_BIN = CARGO_HOME / "bin"
+
+# One target directory shared by all Rust tools and kept between runs, so dependencies
+# compiled once are reused and rebuilding a tool for a new commit is incremental.
+CARGO_TARGET_DIR = Path.home() / ".cache" / "autoinstaller" / "cargo-target"
+
+# Compiler cache used when 'sccache' is installed (also shared between tools).
+SCCACHE_DIR = Path.home() / ".cache" / "autoinstaller" / "sccache"
+
+def get_tool(name):
+    return next(tool for tool in CARGO_TOOLS if tool["name"] == name)
+
+def get_binary_path(name):
+    return CARGO_BIN / get_tool(name)["binary"]
+
+def find_cargo():
+    """
+    Returns the cargo executable. rustup installs to ~/.cargo/bin, which is not in
+    the PATH of this process if rustup was installed during the same run.
+    """
+    return shutil.which("cargo") or (str(CARGO_BIN / "cargo") if (CARGO_BIN / "cargo").exists() else None)
+
+def get_build_env():
+    env = os.environ.copy()
+    CARGO_TARGET_DIR.mkdir(parents=True, exist_ok=True)
+    env["CARGO_TARGET_DIR"] = str(CARGO_TARGET_DIR)
+    env["PATH"] = f"{CARGO_BIN}{os.pathsep}{env.get('PATH', '')}"
+    if shutil.which("sccache"):
+        SCCACHE_DIR.mkdir(parents=True, exist_ok=True)
+        env["RUSTC_WRAPPER"] = "sccache"
+        env["SCCACHE_DIR"] = str(SCCACHE_DIR)
+    return env
+
+def install(name, force=False):
+    """
+    Clones a Rust tool, fetches its crates into the shared registry and builds it
+    with 'cargo install' against the shared target directory.
+    With force=True an existing installation is rebuilt (used by update mode).
+    """
+    tool = get_tool(name)
+    display_name = tool["display_name"]
+    print(f"\n--- Installing '{display_name}' with cargo ---")
+
+    if get_binary_path(name).exists() and not force:
+        print(f"'{display_name}' is already installed. Skipping.")
+        return
+
+    cargo = find_cargo()
+    if not cargo or not shutil.which("git"):
+        print(f"ERROR: 'git' or 'cargo' not found. Cannot build '{display_name}'.")
+        return
+
+    env = get_build_env()
+    with build_workspace.workspace(name) as tmpdir:
+        try:
+            source_path = Path(tmpdir) / name
+            print(f"Cloning {display_name} repository...")
+            event_stream.download(["git", "clone", "--depth", "1", tool["repo"], str(source_path)], tool["repo"],
+                                  source_path / ".git", check=True, capture_output=True)
+            commit = version_tracker.get_local_commit(source_path)
+            locked = ["--locked"] if (source_path / "Cargo.lock").exists() else []
+
+            # Download all crates up front; the build itself then only reads the local registry.
+            print("Fetching crates...")
+            event_stream.download([cargo, "fetch", *locked], "https://crates.io", CARGO_HOME / "registry" / "cache",
+                                  cwd=str(source_path), env=env, check=True, capture_output=True)
+
+            print(f"Building '{display_name}' (target dir: {CARGO_TARGET_DIR})...")
+            event_stream.run([cargo, "install", *locked, "--offline", "--force", "--path", "."],
+                           cwd=str(source_path), env=env, check=True, capture_output=True)
+            version_tracker.record_install(name, commit)
+            print(f"'{display_name}' installed successfully to {get_binary_path(name)}.")
+
+        except subprocess.CalledProcessError as e:
+            print(f"\nERROR: A command failed during '{display_name}' installation: {e}")
+            # get_local_commit() runs in text mode, the build steps do not
+            stderr = e.stderr if isinstance(e.stderr, str) else (e.stderr or b"").decode(errors="replace")
+            print(f"Stderr: {stderr}")
+        except Exception as e:
+            print(f"\nAn unexpected error occurred during '{display_name}' installation: {e}")
+
+if __name__ == "__main__":
+    import sys
+    for tool_name in sys.argv[1:] or [tool["name"] for tool in CARGO_TOOLS]:
+        install(tool_name)
@@ -1,7 +1,9 @@
 import os
 import shutil
 import subprocess
+import tempfile
 from pathlib import Path
+from utils import event_stream, privileged_helper, tool_profiles, wordlist_index
 
 # --- CONFIGURATION ---
 # Add any simple, one-off installation commands to this list.
@@ -10,51 +12,71 @@ from pathlib import Path
 # "check_path" OR "check_command": 
 #   - Use "check_path" to see if a file/directory exists (e.g., "/opt/SecLists-master").
 #   - Use "check_command" to see if a command is in the PATH (e.g., "cargo").
-# "command": The full shell command to execute.
+# "command": The full shell command to execute, run as the user. Tools that need root give a list
+#   of steps instead: argv lists are run as the user, and dicts like {"op": "clone", "url": URL,
+#   "destination": PATH} are operations of the privileged helper (see OPERATIONS there).
 # "cwd": (Optional) The directory to run the command in. Defaults to the user's tools directory.
+# "tags": The roles that need the tool (see utils/tool_profiles.py).
+# "smoke_test": (Optional) Command run by 'main.py verify' to check the tool works. Without it,
+#   the check only looks for "check_path" / "check_command".
+# "post_install": (Optional) Function run after the tool is installed, and on later runs
+#   if "post_install_done" (a function) returns False.
+# Rust tools are built by utils/cargo_builder.py instead, which shares a build cache between them.
 
 TOOLS_DIR = Path("/opt")
 
+SECLISTS_ZIP = Path(tempfile.gettempdir()) / "SecLists.zip"
+
 COMMANDS_TO_RUN = [
     {
         "name": "Rust Toolchain (rustup)",
         "check_command": "cargo",
+        "tags": ["ad"], # Only needed to build RustHound
+        "smoke_test": ["cargo", "--version"],
         "command": "curl --proto '=https' --tlsv1.2 -sSf https://sh.rustup.rs | sh -s -- -y",
         "cwd": None # This command doesn't need a specific directory
     },
     {
         "name": "SecLists Wordlists",
         "check_path": TOOLS_DIR / "SecLists-master",
-        "command": "sudo sh -c 'wget -c https://github.com/danielmiessler/SecLists/archive/master.zip -O SecLists.zip && unzip -q SecLists.zip && rm -f SecLists.zip'",
-        "cwd": str(TOOLS_DIR) # Run this inside the /opt directory
+        "tags": ["web", "cracking"],
+        "command": [
+            ["wget", "-q", "-c", "https://github.com/danielmiessler/SecLists/archive/master.zip", "-O", str(SECLISTS_ZIP)],
+            {"op": "unzip", "archive": str(SECLISTS_ZIP), "destination": str(TOOLS_DIR)},
+            ["rm", "-f", str(SECLISTS_ZIP)],
+        ],
+        "cwd": None,
+        # Catalog, merged lists and lookup index, see utils/wordlist_index.py
+        "post_install": wordlist_index.build,
+        "post_install_done": wordlist_index.is_built,
     },
     {
         "name": "Responder Install",
         "check_path": TOOLS_DIR / "Responder",
-        "command": "sudo sh -c 'git clone --depth 1 https://github.com/lgandx/Responder.git'",
-        "cwd": str(TOOLS_DIR) # Run this inside the /opt directory
-    },
-    {
-        "name": "RustHound",
-        "check_command": "rusthound",
-        "command": "cd /tmp && git clone --depth 1 https://github.com/NH-RED-TEAM/RustHound.git && cd RustHound && make install",
-        "cwd": None # This command doesn't need a specific directory
+        "tags": ["ad"],
+        "command": [{"op": "clone", "url": "https://github.com/lgandx/Responder.git", "destination": str(TOOLS_DIR / "Responder")}],
+        "cwd": None
     },
     {
         "name": "Wpscan",
         "check_command": "wpscan",
-        "command": "sudo sh -c 'gem install wpscan'",
+        "tags": ["web"],
+        "smoke_test": ["wpscan", "--version"],
+        "command": [{"op": "gem_install", "gems": ["wpscan"]}],
         "cwd": None # This command doesn't need a specific directory
     },
     {
         "name": "Metasploit",
         "check_command": "msfvenom",
+        "tags": ["ad", "web"],
         "command": "curl https://raw.githubusercontent.com/rapid7/metasploit-omnibus/master/config/templates/metasploit-framework-wrappers/msfupdate.erb > msfinstall && chmod 755 msfinstall && ./msfinstall",
         "cwd": None # This command doesn't need a specific directory
     },
     {
         "name": "Brave Browser",
         "check_command": "brave",
+        "tags": ["desktop"],
+        "smoke_test": ["brave", "--version"],
         "command": "curl -fsS https://dl.brave.com/install.sh | sh",
         "cwd": None # This command doesn't need a specific directory
     },
@@ -62,14 +84,15 @@ COMMANDS_TO_RUN = [
     # {
     #     "name": "Another Tool",
     #     "check_command": "another-tool",
-    #     "command": "sudo apt install -y another-tool",
+    #     "command": [{"op": "packages", "argv": ["apt", "install", "-y", "another-tool"]}],
     #     "cwd": None
     # }
 ]
 
-def install():
+def install(tags=None):
     """
     Runs a series of arbitrary shell commands for simple installations.
+    With 'tags', only the commands tagged for the selected roles are run.
     """
     print("\n--- Running Custom Installation Commands ---")
 
@@ -77,6 +100,8 @@ def install():
     TOOLS_DIR.mkdir(exist_ok=True)
 
     for tool in COMMANDS_TO_RUN:
+        if not tool_profiles.is_selected(tool, tags):
+            continue
         name = tool["name"]
         command = tool["command"]
         check_path = tool.get("check_path")
@@ -94,6 +119,8 @@ def install():
 
         if is_installed:
             print(f"'{name}' appears to be already installed. Skipping.")
+            if tool.get("post_install") and not tool["post_install_done"]():
+                tool["post_install"]()
             continue
 
         # 2. Run the installation command
@@ -101,15 +128,30 @@ def install():
         try:
             # We use shell=True to handle pipes '|' and chains '&&'.
             # This is safe as we are defining the commands ourselves.
-            subprocess.run(
-                command, 
-                shell=True, 
-                check=True, 
-                capture_output=True, 
-                text=True,
-                cwd=cwd # Run in the specified directory
-            )
+            # Privileged commands are argv steps, run without a shell.
+            if isinstance(command, list):
+                for step in command:
+                    if isinstance(step, dict):
+                        arguments = {key: value for key, value in step.items() if key != "op"}
+                        privileged_helper.run(step["op"], cwd=cwd, check=True, capture_output=True, **arguments)
+                    elif step[0] == "wget":
+                        url = next(argument for argument in step if "://" in argument)
+                        event_stream.download(step, url, step[step.index("-O") + 1], cwd=cwd,
+                                              check=True, capture_output=True, text=True)
+                    else:
+                        subprocess.run(step, check=True, capture_output=True, text=True, cwd=cwd)
+            else:
+                subprocess.run(
+                    command, 
+                    shell=True, 
+                    check=True, 
+                    capture_output=True, 
+                    text=True,
+                    cwd=cwd # Run in the specified directory
+                )
             print(f"'{name}' installed successfully.")
+            if tool.get("post_install"):
+                tool["post_install"]()
 
         except subprocess.CalledProcessError as e:
             print(f"\nERROR: Failed to install '{name}': {e}")
@@ -0,0 +1,145 @@
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+from utils import version_tracker
+
+# --- CONFIGURATION ---
+# John the Ripper formats benchmarked with 'john --test'.
+JOHN_FORMATS = ["NT", "netntlmv2", "krb5tgs", "krb5asrep", "bcrypt"]
+
+# Hashcat modes benchmarked with 'hashcat -b' on the CPU backend.
+# 1000 = NTLM, 5600 = NetNTLMv2, 13100 = Kerberos TGS-REP, 18200 = AS-REP, 3200 = bcrypt
+HASHCAT_MODES = [1000, 5600, 13100, 18200, 3200]
+
+JOHN_BINARY = Path("/opt/john/current/john")
+HASHCAT_BINARY = Path("/opt/hashcat/current/hashcat")
+
+# Benchmark results of every build on this host.
+HISTORY_FILE = Path.home() / ".local" / "share" / "autoinstaller" / "benchmarks.json"
+
+# A build is flagged if it is this much slower than the previous build.
+REGRESSION_THRESHOLD = 0.05
+
+BENCHMARK_TIMEOUT = 300
+
+UNITS = {"": 1, "K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12}
+
+def parse_john_speed(output):
+    """
+    Returns the first 'c/s real' figure of 'john --test' output in candidates per second.
+    """
+    match = re.search(r"([\d.]+)([KMGT]?) c/s real", output)
+    if not match:
+        return None
+    return float(match.group(1)) * UNITS[match.group(2)]
+
+def parse_hashcat_speed(output):
+    """
+    Returns the summed speed of all devices from 'hashcat -b --machine-readable' output,
+    whose lines end with '<mode>:...:<hashes per second>'.
+    """
+    speeds = []
+    for line in output.splitlines():
+        fields = line.strip().split(":")
+        if len(fields) >= 3 and fields[-1].replace(".", "", 1).isdigit():
+            speeds.append(float(fields[-1]))
+    return sum(speeds) if speeds else None
+
+def benchmark_john(formats=JOHN_FORMATS):
+    results = {}
+    for fmt in formats:
+        print(f"Benchmarking john format '{fmt}'...")
+        try:
+            result = subprocess.run([str(JOHN_BINARY), "--test=5", f"--format={fmt}"],
+                                    capture_output=True, text=True, timeout=BENCHMARK_TIMEOUT)
+            results[fmt] = parse_john_speed(result.stdout + result.stderr)
+        except subprocess.TimeoutExpired:
+            print(f"WARNING: john benchmark for '{fmt}' timed out.")
+            results[fmt] = None
+    return results
+
+def benchmark_hashcat(modes=HASHCAT_MODES):
+    results = {}
+    for mode in modes:
+        print(f"Benchmarking hashcat mode {mode} on the CPU backend...")
+        try:
+            command = [str(HASHCAT_BINARY), "-b", "-m", str(mode), "-D", "1", "--machine-readable", "--quiet"]
+            result = subprocess.run(command, cwd=str(HASHCAT_BINARY.parent), capture_output=True,
+                                    text=True, timeout=BENCHMARK_TIMEOUT)
+            results[str(mode)] = parse_hashcat_speed(result.stdout)
+        except subprocess.TimeoutExpired:
+            print(f"WARNING: hashcat benchmark for mode {mode} timed out.")
+            results[str(mode)] = None
+    return results
+
+def load_history():
+    try:
+        with open(HISTORY_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+def save_history(history):
+    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = HISTORY_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_file, HISTORY_FILE)
+
+def find_regressions(history, record):
+    """
+    Compares a record with the previous build of the same tool (a different commit
+    or profile) and returns a list of (mode, old_speed, new_speed) that got slower.
+    """
+    previous = next((old for old in reversed(history) if old["tool"] == record["tool"]
+                     and (old["commit"], old["profile"]) != (record["commit"], record["profile"])), None)
+    if not previous:
+        return []
+    regressions = []
+    for mode, speed in record["speeds"].items():
+        old_speed = previous["speeds"].get(mode)
+        if speed and old_speed and speed < old_speed * (1 - REGRESSION_THRESHOLD):
+            regressions.append((mode, old_speed, speed))
+    return regressions
+
+def run(tools=("john", "hashcat")):
+    """
+    Benchmarks the installed builds, appends the results to the history and
+    flags the ones slower than the previous build. Returns the new records.
+    """
+    print("\n--- Benchmarking cracking throughput ---")
+    runners = {"john": (JOHN_BINARY, benchmark_john), "hashcat": (HASHCAT_BINARY, benchmark_hashcat)}
+    history = load_history()
+    records = []
+
+    for tool in tools:
+        binary, runner = runners[tool]
+        if not binary.exists():
+            print(f"'{binary}' not found. Skipping {tool} benchmark.")
+            continue
+        installed = version_tracker.get_installed(tool)
+        record = {
+            "tool": tool,
+            "commit": installed.get("commit"),
+            "profile": installed.get("profile"),
+            "timestamp": int(time.time()),
+            "speeds": runner(),
+        }
+
+        for mode, speed in record["speeds"].items():
+            print(f"{tool} {mode}: {f'{speed:,.0f} c/s' if speed else 'no result'}")
+        for mode, old_speed, new_speed in find_regressions(history, record):
+            print(f"WARNING: {tool} {mode} is slower than the previous build: "
+                  f"{old_speed:,.0f} -> {new_speed:,.0f} c/s ({new_speed / old_speed - 1:+.1%})")
+
+        history.append(record)
+        records.append(record)
+
+    save_history(history)
+    return records
+
+if __name__ == "__main__":
+    run()
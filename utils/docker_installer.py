@@ -2,6 +2,7 @@ import os
 import shutil
 import subprocess
 import getpass
+from utils import privileged_helper
 
 def install():
     """
@@ -20,8 +21,7 @@ def install():
     try:
         print(f"Adding user '{current_user}' to the 'docker' group...")
         # Using 'gpasswd' is a reliable way to add a user to a group.
-        command = ["sudo", "gpasswd", "-a", current_user, "docker"]
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        result = privileged_helper.run("add_to_group", user=current_user, group="docker", check=True, capture_output=True)
         
         print("User added to 'docker' group successfully.")
         print("\nIMPORTANT: You must LOG OUT and LOG BACK IN for the Docker group changes to take effect.")
@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# --- CONFIGURATION ---
+# Machine-readable progress events, one JSON object per line, next to the normal output.
+# Enabled with 'main.py --events TARGET' (or the AUTOINSTALLER_EVENTS environment variable),
+# where TARGET is a file to append to or 'unix:/path/to/socket'.
+#
+# Every event has these fields:
+#   "schema": SCHEMA_VERSION, bumped only on incompatible changes
+#   "ts":     Unix time in seconds (float)
+#   "run":    Random ID of this run; "host" and "pid" tell concurrent runs apart
+#   "event":  One of the names below; the listed fields are always present
+EVENTS = {
+    "run_start":     ["mode", "installers"],
+    "run_finish":    ["status", "failed", "seconds"],
+    "stage_start":   ["stage"],
+    "stage_finish":  ["stage", "status", "seconds"],
+    "process_spawn": ["argv", "cwd"],
+    "process_exit":  ["argv", "returncode", "seconds"],
+    "download":      ["url", "bytes", "seconds"], # bytes is None where the size is not known (uv)
+    "cache":         ["cache", "key", "hit"],
+    "skip":          ["stage", "reason"],
+    "error":         ["stage", "message"],
+}
+SCHEMA_VERSION = 1
+
+ENV_VAR = "AUTOINSTALLER_EVENTS"
+
+_stream = None
+_lock = threading.Lock()
+_run_id = uuid.uuid4().hex[:12]
+_host = socket.gethostname()
+
+def configure(target=None):
+    """
+    Opens the event stream. Without a target, the environment variable is used;
+    if neither is set, emit() does nothing.
+    """
+    global _stream
+    target = target or os.environ.get(ENV_VAR)
+    if not target:
+        return
+    try:
+        if target.startswith("unix:"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(target[len("unix:"):])
+            _stream = sock.makefile("w", buffering=1)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+            _stream = open(target, "a", buffering=1)
+    except OSError as e:
+        # Like a consumer going away later (see emit), this must not stop the run.
+        print(f"WARNING: Could not open the event stream '{target}' ({e}). Events are disabled.")
+        _stream = None
+
+def is_enabled():
+    return _stream is not None
+
+def emit(event, **fields):
+    """
+    Writes one event. Missing schema fields are filled with None, so consumers can rely on them.
+    """
+    if _stream is None:
+        return
+    record = {"schema": SCHEMA_VERSION, "ts": round(time.time(), 3), "run": _run_id, "host": _host,
+              "pid": os.getpid(), "event": event}
+    record.update({field: None for field in EVENTS[event]})
+    record.update(fields)
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        try:
+            _stream.write(line)
+        except OSError:
+            # A dashboard going away must not break the provisioning run.
+            pass
+
+@contextmanager
+def stage(name):
+    """
+    Emits stage_start/stage_finish around a block. The block can set the final
+    status through the yielded dict (default 'ok'; 'error' if it raises).
+    """
+    start = time.monotonic()
+    state = {"status": "ok"}
+    emit("stage_start", stage=name)
+    try:
+        yield state
+    except BaseException as e:
+        state["status"] = "error"
+        emit("error", stage=name, message=str(e))
+        raise
+    finally:
+        emit("stage_finish", stage=name, status=state["status"], seconds=round(time.monotonic() - start, 3))
+
+def process_spawned(argv, cwd=None):
+    """
+    Emits process_spawn and returns the start time to pass to process_exited().
+    """
+    emit("process_spawn", argv=list(argv), cwd=str(cwd) if cwd else None)
+    return time.monotonic()
+
+def process_exited(argv, returncode, start):
+    emit("process_exit", argv=list(argv), returncode=returncode, seconds=round(time.monotonic() - start, 3))
+
+def get_size(path):
+    """
+    Returns the size of a file, or of all files below a directory, in bytes (0 if missing).
+    """
+    path = str(path)
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+def downloaded(url, start, path=None, size_before=0):
+    """
+    Emits a download event for 'url', started at 'start' (see process_spawned). The bytes are
+    how much 'path' (the downloaded file, clone or cache directory) grew, or None without a path.
+    """
+    if _stream is None:
+        return
+    size = get_size(path) - size_before if path else None
+    emit("download", url=url, bytes=size, seconds=round(time.monotonic() - start, 3))
+
+def download(argv, url, path=None, cwd=None, check=False, **kwargs):
+    """
+    run() for a command that downloads 'url' into 'path', emitting a download event when it succeeds.
+    """
+    size_before = get_size(path) if path and is_enabled() else 0
+    start = time.monotonic()
+    result = run(argv, cwd=cwd, **kwargs)
+    if result.returncode == 0:
+        downloaded(url, start, path, size_before)
+    if check:
+        result.check_returncode()
+    return result
+
+def run(argv, cwd=None, check=False, **kwargs):
+    """
+    subprocess.run() that emits process_spawn/process_exit around the process.
+    """
+    start = process_spawned(argv, cwd)
+    try:
+        result = subprocess.run(argv, cwd=cwd, **kwargs)
+    except (OSError, subprocess.SubprocessError):
+        process_exited(argv, None, start)
+        raise
+    process_exited(argv, result.returncode, start)
+    if check:
+        result.check_returncode()
+    return result
@@ -0,0 +1,184 @@
+import shlex
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# --- CONFIGURATION ---
+# Number of hosts provisioned at the same time.
+DEFAULT_JOBS = 4
+
+# Directory (relative to the remote user's home) the project is copied to.
+REMOTE_DIR = "autoinstaller"
+
+# Never prompt for a password: an unattended fleet run must fail fast instead.
+SSH_OPTIONS = ["-o", "BatchMode=yes", "-o", "ConnectTimeout=10", "-o", "StrictHostKeyChecking=accept-new"]
+
+# Run on every host before anything is pushed. main.py runs with stdin closed there, so sudo
+# cannot ask for a password: the remote user must be root or have NOPASSWD sudo.
+SUDO_CHECK = '[ "$(id -u)" = 0 ] || sudo -n true'
+
+# Files and directories that are not pushed to the hosts.
+PUSH_EXCLUDES = [".git", "__pycache__", "*.pyc"]
+
+# Must match STATUS_PREFIX in main.py.
+STATUS_PREFIX = "[status]"
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+_print_lock = threading.Lock()
+
+def log(host, message):
+    """
+    Prints one line of the aggregated view, prefixed with the host it belongs to.
+    """
+    with _print_lock:
+        print(f"[{host}] {message}", flush=True)
+
+def load_inventory(path):
+    """
+    Reads an inventory file with one '[user@]host[:port]' per line.
+    Blank lines and '#' comments are ignored, repeated hosts are provisioned once.
+    """
+    hosts = []
+    for number, line in enumerate(Path(path).read_text().splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        if line in hosts:
+            print(f"WARNING: '{line}' is listed again on line {number} of {path}. Provisioning it once.")
+            continue
+        hosts.append(line)
+    return hosts
+
+def ssh_command(host, remote_command):
+    """
+    Builds the ssh command line for a '[user@]host[:port]' inventory entry.
+    """
+    destination, _, port = host.partition(":")
+    command = ["ssh", *SSH_OPTIONS]
+    if port:
+        command.extend(["-p", port])
+    command.extend([destination, remote_command])
+    return command
+
+def check_sudo(host):
+    """
+    Checks that the host is reachable and privileged steps will not wait for a password.
+    Returns None if so, otherwise the error to report.
+    """
+    check = subprocess.run(ssh_command(host, SUDO_CHECK), stdin=subprocess.DEVNULL,
+                           capture_output=True, text=True)
+    if check.returncode == 255:
+        return f"ssh failed: {check.stderr.strip() or 'exit code 255'}"
+    if check.returncode != 0:
+        return "sudo needs a password ('sudo -n true' failed). Allow NOPASSWD sudo for the remote user or connect as root"
+    return None
+
+def push_project(host):
+    """
+    Copies the project to REMOTE_DIR on the host by streaming a tarball over ssh.
+    """
+    tar_cmd = ["tar", "-czf", "-", "-C", str(PROJECT_DIR)]
+    tar_cmd += [f"--exclude={pattern}" for pattern in PUSH_EXCLUDES]
+    tar_cmd.append(".")
+    remote = f"mkdir -p {REMOTE_DIR} && tar -xzf - -C {REMOTE_DIR}"
+
+    p1 = subprocess.Popen(tar_cmd, stdout=subprocess.PIPE)
+    p2 = subprocess.Popen(ssh_command(host, remote), stdin=p1.stdout,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    p1.stdout.close() # Allow p1 to receive a SIGPIPE if p2 exits.
+    _, stderr = p2.communicate()
+    p1.wait()
+    if p2.returncode != 0:
+        raise subprocess.CalledProcessError(p2.returncode, p2.args, stderr=stderr)
+
+def provision_host(host, remote_args):
+    """
+    Pushes the project to one host and runs main.py there, streaming its output.
+    Returns {"ok": bool, "statuses": {installer: status}, "error": str or None}.
+    """
+    result = {"ok": False, "statuses": {}, "error": None}
+    try:
+        result["error"] = check_sudo(host)
+        if result["error"]:
+            log(host, f"ERROR: {result['error']}")
+            return result
+
+        log(host, "Pushing project...")
+        push_project(host)
+
+        remote_command = f"cd {REMOTE_DIR} && python3 -u main.py {shlex.join(remote_args)}"
+        log(host, f"Running: {remote_command}")
+        process = subprocess.Popen(ssh_command(host, remote_command), stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, text=True)
+        for line in process.stdout:
+            line = line.rstrip()
+            if not line:
+                continue
+            if line.startswith(STATUS_PREFIX):
+                name, _, status = line[len(STATUS_PREFIX):].strip().partition(":")
+                result["statuses"][name.strip()] = status.strip()
+            log(host, line)
+        process.wait()
+
+        if process.returncode != 0:
+            result["error"] = f"main.py exited with code {process.returncode}"
+        else:
+            result["ok"] = not any(status == "failed" for status in result["statuses"].values())
+
+    except subprocess.CalledProcessError as e:
+        result["error"] = f"push failed: {(e.stderr or '').strip() or e}"
+    except Exception as e:
+        result["error"] = str(e)
+
+    if result["error"]:
+        log(host, f"ERROR: {result['error']}")
+    else:
+        log(host, "Finished.")
+    return result
+
+def print_summary(results):
+    """
+    Prints a matrix of installer status per host.
+    """
+    names = []
+    for result in results.values():
+        for name in result["statuses"]:
+            if name not in names:
+                names.append(name)
+
+    host_width = max([len("HOST")] + [len(host) for host in results])
+    widths = [max(len(name), 9) for name in names]
+    header = "HOST".ljust(host_width) + "  " + "  ".join(name.ljust(w) for name, w in zip(names, widths)) + "  RESULT"
+    print("\n--- Fleet Summary ---")
+    print(header)
+    print("-" * len(header))
+    for host, result in results.items():
+        cells = [result["statuses"].get(name, "-").ljust(w) for name, w in zip(names, widths)]
+        outcome = "ok" if result["ok"] else (result["error"] or "failed")
+        print(host.ljust(host_width) + "  " + "  ".join(cells) + "  " + outcome)
+
+def provision(hosts, remote_args, jobs=DEFAULT_JOBS):
+    """
+    Provisions every host concurrently (at most 'jobs' at a time) and prints a summary.
+    Returns {host: result} in inventory order; empty if there are no hosts, which callers
+    treat as a failure.
+    """
+    print(f"\n--- Provisioning {len(hosts)} host(s) over SSH ({jobs} at a time) ---")
+    if not hosts:
+        print("ERROR: The inventory is empty."); return {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = {host: executor.submit(provision_host, host, remote_args) for host in hosts}
+        results = {host: future.result() for host, future in futures.items()}
+
+    print_summary(results)
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: fleet_manager.py INVENTORY [main.py arguments...]"); sys.exit(1)
+    results = provision(load_inventory(sys.argv[1]), sys.argv[2:] or ["install"])
+    sys.exit(0 if results and all(result["ok"] for result in results.values()) else 1)
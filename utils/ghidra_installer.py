@@ -3,24 +3,124 @@ import os
 import shutil
 import platform
 import subprocess
-import tempfile
+import time
 import requests
 from pathlib import Path
+from utils import build_workspace, event_stream, privileged_helper, versioned_install
 
-def install():
+INSTALL_DIR = Path("/opt/ghidra")
+
+# --- JVM TUNING ---
+# Ghidra reads extra JVM arguments from support/launch.properties (VMARGS=...), for the GUI
+# and for analyzeHeadless alike. The installer writes a block sized for this host there:
+#   "maxmem":  Max heap, HEAP_FRACTION of the RAM (at least MIN_HEAP_MB), leaving
+#              OS_RESERVE_MB for the system and the native decompiler processes.
+#   "gc":      SMALL_HEAP_GC below SMALL_HEAP_MB of heap, otherwise DEFAULT_GC.
+#   "threads": Analysis threads (Ghidra's cpu.core.limit), all cores but one.
+# Each value can be overridden with 'main.py --ghidra-tuning maxmem=24G,gc=zgc,threads=8'.
+HEAP_FRACTION = 0.5
+MIN_HEAP_MB = 768
+OS_RESERVE_MB = 2048
+SMALL_HEAP_MB = 2048
+SMALL_HEAP_GC = "serial"
+DEFAULT_GC = "g1"
+GC_ARGS = {
+    "serial": ["-XX:+UseSerialGC"],
+    "parallel": ["-XX:+UseParallelGC", "-XX:ParallelGCThreads={threads}"],
+    # Ghidra's program databases keep many duplicate strings on the heap.
+    "g1": ["-XX:+UseG1GC", "-XX:+UseStringDeduplication", "-XX:ParallelGCThreads={threads}",
+           "-XX:ConcGCThreads={conc_threads}"],
+    "zgc": ["-XX:+UseZGC"],
+}
+TUNING_BEGIN = "# BEGIN autoinstaller JVM tuning"
+TUNING_END = "# END autoinstaller JVM tuning"
+
+def get_total_ram_mb():
+    """
+    Returns MemTotal from /proc/meminfo in MB, or 0 if it cannot be read.
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+def parse_size_mb(value):
+    """
+    Converts a heap size like '24G', '4096M' or '4096' (MB) to MB.
+    """
+    value = str(value).strip().upper()
+    if value.endswith("G"):
+        return int(float(value[:-1]) * 1024)
+    return int(value.rstrip("M"))
+
+def get_tuning(overrides=None, ram_mb=None, cores=None):
+    """
+    Returns {"maxmem" (MB), "gc", "threads"} sized for the host, with 'overrides' applied.
+    """
+    overrides = overrides or {}
+    ram_mb = ram_mb if ram_mb is not None else get_total_ram_mb()
+    cores = cores or os.cpu_count() or 1
+    if ram_mb:
+        maxmem = max(MIN_HEAP_MB, min(int(ram_mb * HEAP_FRACTION), ram_mb - OS_RESERVE_MB))
+    else:
+        maxmem = MIN_HEAP_MB
+    if "maxmem" in overrides:
+        maxmem = parse_size_mb(overrides["maxmem"])
+    gc = overrides.get("gc") or (SMALL_HEAP_GC if maxmem < SMALL_HEAP_MB else DEFAULT_GC)
+    if gc not in GC_ARGS:
+        raise ValueError(f"Unknown garbage collector '{gc}' (choose from {', '.join(GC_ARGS)})")
+    threads = int(overrides.get("threads") or max(1, cores - 1))
+    return {"maxmem": maxmem, "gc": gc, "threads": threads}
+
+def get_vm_args(tuning):
+    gc_args = [arg.format(threads=tuning["threads"], conc_threads=max(1, tuning["threads"] // 4)) for arg in GC_ARGS[tuning["gc"]]]
+    return [f"-Xmx{tuning['maxmem']}m"] + gc_args + [f"-Dcpu.core.limit={tuning['threads']}"]
+
+def apply_tuning(ghidra_dir, overrides=None):
+    """
+    Writes the tuning block into <ghidra_dir>/support/launch.properties, replacing an earlier one.
+    """
+    properties = Path(ghidra_dir) / "support" / "launch.properties"
+    if not properties.exists():
+        print(f"WARNING: {properties} not found. Ghidra keeps its default JVM settings.")
+        return
+    tuning = get_tuning(overrides)
+    lines = properties.read_text().splitlines()
+    if TUNING_BEGIN in lines and TUNING_END in lines:
+        del lines[lines.index(TUNING_BEGIN):lines.index(TUNING_END) + 1]
+    lines += [TUNING_BEGIN] + [f"VMARGS={arg}" for arg in get_vm_args(tuning)] + [TUNING_END]
+    content = "\n".join(lines) + "\n"
+    try:
+        properties.write_text(content)
+    except PermissionError:
+        # Ghidra versions deployed by root keep root's ownership
+        privileged_helper.run("write", path=str(properties), input=content, check=True)
+    print(f"Tuned Ghidra's JVM: {tuning['maxmem']} MB max heap, {tuning['gc']} GC, {tuning['threads']} analysis threads.")
+
+def install(tuning=None):
     """
-    Downloads, unzips, and installs the latest version of Ghidra to /opt/ghidra.
+    Downloads, unzips, and installs the latest version of Ghidra as a new version
+    under /opt/ghidra, switching /opt/ghidra/current to it.
+    The JVM settings are sized for this host; 'tuning' overrides them (see get_tuning).
     """
     print("\n--- Installing 'Ghidra' ---")
 
     # Define installation directory in /opt and symlink in user's home
-    install_dir = Path("/opt/ghidra")
-    local_bin = "usr" / "local" / "bin"
+    install_dir = INSTALL_DIR
+    local_bin = Path.home() / ".local" / "bin"
     symlink_path = local_bin / "ghidra"
 
     # 1. Check if Ghidra seems to be already installed
-    if install_dir.exists() and symlink_path.exists():
+    if versioned_install.is_installed(install_dir) and symlink_path.exists():
         print(f"'Ghidra' appears to be already installed in {install_dir}. Skipping.")
+        try:
+            apply_tuning(install_dir / versioned_install.CURRENT_LINK, tuning)
+        except Exception as e:
+            print(f"WARNING: Could not tune Ghidra's JVM settings: {e}")
         return
 
     # 2. Check for dependencies
@@ -44,37 +144,35 @@ def install():
         print(f"Found download URL: {zip_url}")
 
         # 4. Download and unzip in a temporary directory
-        with tempfile.TemporaryDirectory() as tmpdir:
+        with build_workspace.workspace("ghidra") as tmpdir:
             tmp_path = Path(tmpdir)
             zip_file = tmp_path / "ghidra.zip"
             unzip_dir = tmp_path / "ghidra_unzipped"
 
             print(f"Downloading to {zip_file}...")
-            subprocess.run(["curl", "-L", "-o", str(zip_file), zip_url], check=True)
+            start = time.monotonic()
+            event_stream.run(["curl", "-L", "-o", str(zip_file), zip_url], check=True)
+            event_stream.emit("download", url=zip_url, bytes=zip_file.stat().st_size, seconds=round(time.monotonic() - start, 3))
 
             print(f"Unzipping to {unzip_dir}...")
-            subprocess.run(["unzip", "-q", str(zip_file), "-d", str(unzip_dir)], check=True)
+            event_stream.run(["unzip", "-q", str(zip_file), "-d", str(unzip_dir)], check=True)
 
             ghidra_source_dir = next(unzip_dir.iterdir(), None)
             if not ghidra_source_dir:
                 print("ERROR: Unzipping failed, no contents found.")
                 return
+            apply_tuning(ghidra_source_dir, tuning)
 
             # 5. Move to the final destination using sudo
             print(f"Moving Ghidra to {install_dir} using sudo...")
-            # Remove old version if it exists, with sudo
-            if install_dir.exists():
-                print(f"Removing old version at {install_dir}...")
-                subprocess.run(["sudo", "rm", "-rf", str(install_dir)], check=True)
-            
-            # Move the new version into place, with sudo
-            subprocess.run(["sudo", "mv", str(ghidra_source_dir), str(install_dir)], check=True)
+            # The previous version stays in place until 'current' is switched to the new one
+            versioned_install.deploy(ghidra_source_dir, install_dir, data.get("tag_name") or ghidra_source_dir.name)
 
         # 6. Create a symbolic link for easy execution (no sudo needed for this part)
         print(f"Creating symbolic link at {symlink_path}")
-        local_bin.mkdir(exist_ok=True)
+        local_bin.mkdir(parents=True, exist_ok=True)
         
-        ghidra_executable = install_dir / "ghidraRun"
+        ghidra_executable = install_dir / versioned_install.CURRENT_LINK / "ghidraRun"
         if symlink_path.exists() or symlink_path.is_symlink():
             symlink_path.unlink()
         
@@ -0,0 +1,183 @@
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from utils import artifact_store, build_workspace, event_stream, version_tracker
+
+# --- CONFIGURATION ---
+# Go tools built with 'go build'. Add future Go tools here (and an entry in main.INSTALLERS).
+#
+# "name":         Short name, also used for the version tracker.
+# "display_name": A friendly name for logging.
+# "repo":         The git repository.
+# "binary":       The executable 'go build' produces, installed to ~/.local/bin.
+# "note":         (Optional) Printed after a successful installation.
+GO_TOOLS = [
+    {
+        "name": "ffuf",
+        "display_name": "ffuf",
+        "repo": "https://github.com/ffuf/ffuf",
+        "binary": "ffuf",
+    },
+    {
+        "name": "fzf",
+        "display_name": "fzf",
+        "repo": "https://github.com/junegunn/fzf.git",
+        "binary": "fzf",
+        "note": "For shell integration (key bindings, completion), you may need to run the installer script inside the cloned repo manually.",
+    },
+]
+
+GO_CACHE_ROOT = Path.home() / ".cache" / "autoinstaller" / "go"
+
+# Module and build caches owned by the installer, so they persist whatever the environment says.
+# Sources are cloned into a build workspace (see utils/build_workspace.py) for every build;
+# only these caches are kept between builds.
+GOMODCACHE = GO_CACHE_ROOT / "mod"
+GOCACHE = GO_CACHE_ROOT / "build"
+
+# Optional directory laid out like a module proxy (e.g. a mirror copied from another
+# machine). It is tried before the network when it exists.
+GO_PROXY_DIR = GO_CACHE_ROOT / "proxy"
+DEFAULT_GOPROXY = "https://proxy.golang.org,direct"
+
+LOCAL_BIN = Path.home() / ".local" / "bin"
+
+# Tools whose modules were already fetched during this run.
+_prefetched = set()
+
+def get_tool(name):
+    return next(tool for tool in GO_TOOLS if tool["name"] == name)
+
+def get_build_env():
+    env = os.environ.copy()
+    env["GOMODCACHE"] = str(GOMODCACHE)
+    env["GOCACHE"] = str(GOCACHE)
+    if GO_PROXY_DIR.is_dir():
+        env["GOPROXY"] = f"file://{GO_PROXY_DIR},{env.get('GOPROXY', DEFAULT_GOPROXY)}"
+    return env
+
+def fetch_source(tool, workspace):
+    """
+    Clones a tool into a build workspace and downloads its modules into the shared module cache.
+    Returns the clone's path.
+    """
+    source_path = Path(workspace) / tool["name"]
+    env = get_build_env()
+    event_stream.download(["git", "clone", "--depth", "1", tool["repo"], str(source_path)], tool["repo"],
+                          source_path / ".git", check=True, capture_output=True)
+    # Counted as what the module cache grew by, i.e. the modules that were not cached yet
+    event_stream.download(["go", "mod", "download"], env.get("GOPROXY", DEFAULT_GOPROXY), GOMODCACHE / "cache" / "download",
+                          cwd=str(source_path), env=env, check=True, capture_output=True)
+    return source_path
+
+def prefetch_one(tool):
+    """
+    Fills the module cache for a tool that is built later in the run.
+    """
+    with build_workspace.workspace(tool["name"]) as workspace:
+        fetch_source(tool, workspace)
+    _prefetched.add(tool["name"])
+
+def prefetch(names):
+    """
+    Updates the sources and downloads the modules of several tools concurrently.
+    Failures are only reported; the build of that tool retries and shows the error.
+    """
+    tools = [get_tool(name) for name in names if name not in _prefetched]
+    if not tools:
+        return
+    print(f"Fetching sources and Go modules for {', '.join(tool['name'] for tool in tools)}...")
+    with ThreadPoolExecutor(max_workers=len(tools)) as executor:
+        futures = {tool["name"]: executor.submit(prefetch_one, tool) for tool in tools}
+    for name, future in futures.items():
+        if future.exception():
+            print(f"WARNING: Prefetching '{name}' failed: {future.exception()}")
+
+def get_artifact_key(tool, commit):
+    return artifact_store.make_key(tool["name"], commit, {"go build": tool["binary"]})
+
+def fetch_artifact(tool):
+    """
+    Installs the binary of the upstream commit from the artifact store. Returns True on success.
+    """
+    commit = version_tracker.get_upstream_commit(tool["repo"])
+    with build_workspace.workspace(tool["name"]) as tmpdir:
+        if not artifact_store.fetch(get_artifact_key(tool, commit), tmpdir):
+            return False
+        LOCAL_BIN.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(Path(tmpdir) / tool["binary"]), str(LOCAL_BIN / tool["binary"]))
+    version_tracker.record_install(tool["name"], commit)
+    return True
+
+def publish_artifact(tool, commit):
+    if not artifact_store.is_enabled():
+        return
+    with build_workspace.workspace(tool["name"]) as tmpdir:
+        shutil.copy2(LOCAL_BIN / tool["binary"], Path(tmpdir) / tool["binary"])
+        artifact_store.publish(get_artifact_key(tool, commit), tmpdir, tool["name"], commit, {"go build": tool["binary"]})
+
+def install(name, force=False):
+    """
+    Builds a Go tool in a build workspace with the shared module and build caches
+    and installs the binary to ~/.local/bin.
+    With force=True an existing installation is rebuilt (used by update mode).
+    Go tools that are not installed yet are prefetched at the same time.
+    With an artifact store, a published build of the upstream commit is used instead.
+    """
+    tool = get_tool(name)
+    display_name = tool["display_name"]
+    print(f"\n--- Installing '{display_name}' from source ---")
+
+    if shutil.which(tool["binary"]) and not force:
+        print(f"'{display_name}' is already installed. Skipping.")
+        return
+
+    try:
+        if artifact_store.is_enabled() and fetch_artifact(tool):
+            print(f"'{display_name}' installed successfully.")
+            return
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"WARNING: Could not query the upstream commit of '{display_name}': {e}")
+
+    if not all(shutil.which(cmd) for cmd in ['git', 'go']):
+        print(f"ERROR: 'git' or 'go' not found. Cannot build '{display_name}'.")
+        return
+
+    try:
+        # The modules of the other missing Go tools are downloaded while this one builds
+        pending = [other["name"] for other in GO_TOOLS if other["name"] != name and not shutil.which(other["binary"])]
+        with ThreadPoolExecutor(max_workers=1) as executor, build_workspace.workspace(name) as workspace:
+            executor.submit(prefetch, pending)
+            event_stream.emit("cache", cache="go-modules", key=name, hit=name in _prefetched)
+            source_path = fetch_source(tool, workspace)
+            commit = version_tracker.get_local_commit(source_path)
+
+            print(f"Building '{display_name}' with Go...")
+            output = source_path / tool["binary"]
+            event_stream.run(["go", "build", "-o", str(output)], cwd=str(source_path), env=get_build_env(),
+                             check=True, capture_output=True)
+
+            LOCAL_BIN.mkdir(parents=True, exist_ok=True)
+            print(f"Moving compiled '{tool['binary']}' binary to {LOCAL_BIN}")
+            shutil.move(str(output), str(LOCAL_BIN / tool["binary"]))
+        version_tracker.record_install(name, commit)
+        publish_artifact(tool, commit)
+
+        print(f"'{display_name}' installed successfully.")
+        if tool.get("note"):
+            print(f"NOTE: {tool['note']}")
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: A command failed during '{display_name}' installation: {e}")
+        # get_local_commit() runs in text mode, the build steps do not
+        stderr = e.stderr if isinstance(e.stderr, str) else (e.stderr or b"").decode(errors="replace")
+        print(f"Stderr: {stderr}")
+    except Exception as e:
+        print(f"\nAn unexpected error occurred during '{display_name}' installation: {e}")
+
+if __name__ == "__main__":
+    import sys
+    for tool_name in sys.argv[1:] or [tool["name"] for tool in GO_TOOLS]:
+        install(tool_name)
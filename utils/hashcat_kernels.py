@@ -0,0 +1,73 @@
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from utils import cracking_benchmark
+
+# Hash modes whose OpenCL kernels are compiled into the kernel cache at install time:
+# the modes the cracking benchmark measures, so the benchmark never waits on a compile.
+PREWARM_MODES = cracking_benchmark.HASHCAT_MODES
+
+# Attack modes to pre-warm (kernels differ per attack mode): 0 = wordlist, 3 = mask.
+PREWARM_ATTACK_MODES = [0]
+
+# Number of modes compiled at the same time.
+PREWARM_JOBS = max(1, min(4, (os.cpu_count() or 1) // 2))
+
+PREWARM_TIMEOUT = 900
+
+def get_example_hash(hashcat_path, mode):
+    """
+    Returns the example hash hashcat ships for a mode, or None.
+    """
+    result = subprocess.run(["./hashcat", "--example-hashes", "-m", str(mode)], cwd=str(hashcat_path),
+                            capture_output=True, text=True)
+    match = re.search(r"(?:EXAMPLE_HASH|Example\.Hash\.*)\s*:\s*(\S.*)", result.stdout)
+    return match.group(1).strip() if match else None
+
+def prewarm_mode(hashcat_path, mode, attack_mode):
+    """
+    Runs a tiny attack on the CPU backend so hashcat compiles and caches the kernels for 'mode'.
+    """
+    example_hash = get_example_hash(hashcat_path, mode)
+    if not example_hash:
+        return f"mode {mode}: no example hash"
+    session = f"prewarm-{mode}-{attack_mode}"
+    hash_file = hashcat_path / f"{session}.hash"
+    word_file = hashcat_path / f"{session}.words"
+    hash_file.write_text(example_hash + "\n")
+    word_file.write_text("autoinstaller\n")
+    target = str(word_file) if attack_mode == 0 else "?d"
+    command = ["./hashcat", "-m", str(mode), "-a", str(attack_mode), "-D", "1", "--session", session,
+               "--potfile-disable", "--logfile-disable", "--restore-disable", "--quiet", "--runtime", "5",
+               str(hash_file), target]
+    try:
+        result = subprocess.run(command, cwd=str(hashcat_path), capture_output=True, text=True, timeout=PREWARM_TIMEOUT)
+        # Exit codes 0 (cracked) and 1 (exhausted) both mean the kernels were built
+        status = "ok" if result.returncode in (0, 1) else f"exit code {result.returncode}"
+    except subprocess.TimeoutExpired:
+        status = "timed out"
+    finally:
+        hash_file.unlink(missing_ok=True)
+        word_file.unlink(missing_ok=True)
+    return f"mode {mode} (-a {attack_mode}): {status}"
+
+def prewarm_kernel_cache(hashcat_path, modes=PREWARM_MODES):
+    """
+    Compiles the OpenCL kernels of the common modes in parallel on the CPU runtime,
+    so the cache ships with the installation and the first real crack starts immediately.
+    """
+    print(f"Pre-warming the kernel cache for modes {', '.join(map(str, modes))} ({PREWARM_JOBS} at a time)...")
+    jobs = [(mode, attack_mode) for mode in modes for attack_mode in PREWARM_ATTACK_MODES]
+    with ThreadPoolExecutor(max_workers=PREWARM_JOBS) as executor:
+        for message in executor.map(lambda job: prewarm_mode(hashcat_path, *job), jobs):
+            print(f"  {message}")
+
+def post_build(hashcat_path, prewarm=False):
+    """
+    Recipe hook run by source_builder after Hashcat is compiled. The kernel cache lives
+    inside the application folder, so warming it here means it moves to /opt/hashcat
+    together with the binary.
+    """
+    if prewarm:
+        prewarm_kernel_cache(hashcat_path)
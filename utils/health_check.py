@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from utils import cargo_builder, command_runner, tool_profiles, uv_tools_installer
+
+# --- CONFIGURATION ---
+# Smoke tests of the managed tools, run by 'main.py verify'.
+#
+# "name":      Name shown in the report.
+# "installer": The main.INSTALLERS entry the tool belongs to (used by '--only').
+# "command":   Command that must exit with one of "ok_codes" (default [0]). Its first
+#              line of output is reported as the version. Without a command, the tool
+#              only has to exist ("path" or the program in the PATH).
+# "path":      (Optional) Absolute path checked instead of looking the program up in the PATH.
+SMOKE_TESTS = [
+    {"name": "nmap", "installer": "nmap", "command": ["nmap", "--version"]},
+    {"name": "john", "installer": "john", "command": ["/opt/john/current/john", "--list=build-info"]},
+    {"name": "hashcat", "installer": "hashcat", "command": ["/opt/hashcat/current/hashcat", "--version"]},
+    {"name": "tmux", "installer": "tmux", "command": ["tmux", "-V"]},
+    {"name": "rlwrap", "installer": "rlwrap", "command": ["rlwrap", "--version"]},
+    # Without arguments proxychains4 prints its usage and exits with 1.
+    {"name": "proxychains4", "installer": "proxychains", "command": ["proxychains4"], "ok_codes": [1]},
+    {"name": "xclip", "installer": "xclip", "command": ["xclip", "-version"]},
+    {"name": "fzf", "installer": "fzf", "command": ["fzf", "--version"]},
+    {"name": "ffuf", "installer": "ffuf", "command": ["ffuf", "-V"]},
+    {"name": "sqlmap", "installer": "sqlmap", "path": "/opt/sqlmap/current/sqlmap.py",
+     "command": ["python3", "/opt/sqlmap/current/sqlmap.py", "--version"]},
+    # Starting the JVM takes longer than the whole check may, so Ghidra only has to be there.
+    {"name": "ghidra", "installer": "ghidra", "path": "/opt/ghidra/current/ghidraRun"},
+    {"name": "rusthound", "installer": "rusthound", "command": [str(cargo_builder.get_binary_path("rusthound")), "--version"]},
+]
+
+# Seconds a single smoke test may take before it is killed and counted as failed.
+TIMEOUT = 5
+MAX_PARALLEL_CHECKS = 16
+
+# Where the installers put user-level binaries, which may not be in this process' PATH yet.
+EXTRA_PATHS = [Path.home() / ".local" / "bin", cargo_builder.CARGO_BIN]
+
+def get_search_path():
+    return os.pathsep.join([os.environ.get("PATH", "")] + [str(path) for path in EXTRA_PATHS])
+
+def get_checks():
+    """
+    Returns SMOKE_TESTS plus one check per uv tool and command_runner tool.
+    """
+    checks = list(SMOKE_TESTS)
+    for tool in uv_tools_installer.UV_TOOLS:
+        checks.append({"name": tool["check_name"], "installer": "uv-tools", "command": [tool["check_name"], "--help"],
+                       "tags": tool.get("tags", [])})
+    for tool in command_runner.COMMANDS_TO_RUN:
+        check = {"name": tool["name"], "installer": "commands", "tags": tool.get("tags", [])}
+        if tool.get("smoke_test"):
+            check["command"] = tool["smoke_test"]
+        elif tool.get("check_path"):
+            check["path"] = str(tool["check_path"])
+        else:
+            check["command_name"] = tool["check_command"]
+        checks.append(check)
+    return checks
+
+def resolve(check):
+    """
+    Returns the absolute path of the checked program or file, or None if it is missing.
+    """
+    if check.get("path"):
+        return check["path"] if os.path.exists(check["path"]) else None
+    program = check["command"][0] if check.get("command") else check["command_name"]
+    return shutil.which(program, path=get_search_path())
+
+def run_with_timeout(command, timeout):
+    """
+    Runs a command in its own process group and kills the whole group on timeout,
+    so a hanging tool (or a child it spawned) cannot stall the check.
+    Returns (returncode, output), with returncode None on timeout.
+    """
+    env = os.environ.copy()
+    env["PATH"] = get_search_path()
+    process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, errors="replace", env=env, start_new_session=True)
+    try:
+        output, _ = process.communicate(timeout=timeout)
+        return process.returncode, output
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        return None, ""
+
+def run_check(check, timeout=TIMEOUT):
+    result = {"name": check["name"], "installer": check["installer"], "path": resolve(check),
+              "version": None, "status": "missing", "seconds": 0.0}
+    if not result["path"]:
+        return result
+    if not check.get("command"):
+        result["status"] = "pass"
+        if os.path.islink(os.path.dirname(result["path"])):
+            result["version"] = os.path.basename(os.readlink(os.path.dirname(result["path"])))
+        return result
+
+    start = time.monotonic()
+    try:
+        returncode, output = run_with_timeout(check["command"], timeout)
+    except OSError as e:
+        returncode, output = -1, str(e)
+    result["seconds"] = round(time.monotonic() - start, 2)
+
+    if returncode is None:
+        result["status"] = "timeout"
+        return result
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    result["version"] = lines[0][:60] if lines else None
+    result["status"] = "pass" if returncode in check.get("ok_codes", [0]) else "fail"
+    return result
+
+def verify(installers=None, tags=None, timeout=TIMEOUT):
+    """
+    Runs the smoke tests (of the given installers and tags only, if set) concurrently.
+    Returns the results in check order. An empty 'installers' selects nothing.
+    """
+    checks = [check for check in get_checks() if (installers is None or check["installer"] in installers)
+              and tool_profiles.is_selected(check, tags)]
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_CHECKS) as executor:
+        return list(executor.map(lambda check: run_check(check, timeout), checks))
+
+def print_report(results):
+    print("\n--- Health check ---")
+    name_width = max([len(result["name"]) for result in results] + [4])
+    print(f"{'TOOL'.ljust(name_width)}  {'STATUS':8} {'VERSION':40} PATH")
+    for result in results:
+        print(f"{result['name'].ljust(name_width)}  {result['status']:8} {(result['version'] or '-')[:40]:40} {result['path'] or '-'}")
+    failed = [result["name"] for result in results if result["status"] != "pass"]
+    print(f"\n{len(results) - len(failed)}/{len(results)} checks passed.")
+
+def is_healthy(results):
+    return all(result["status"] == "pass" for result in results)
+
+if __name__ == "__main__":
+    import sys
+    report = verify()
+    if "--json" in sys.argv:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,192 @@
+import os
+import platform
+import re
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# --- CONFIGURATION ---
+# Mirrors probed by 'main.py --select-mirror' before the system packages are installed.
+# Every candidate is asked for the same small index file; the mirror that would fetch
+# REFERENCE_BYTES fastest (latency + REFERENCE_BYTES / throughput) is used for the run.
+#
+# "probe":      Path of the index file, relative to the mirror URL. {releasever} and
+#               {arch} are replaced with the values of this machine.
+# "candidates": Mirror base URLs. Sources pointing at one of them are switched to the
+#               selected mirror, so the distro's default mirror belongs in the list.
+# Add '--mirrors URL,URL' to probe other candidates (e.g. local stand-in mirrors).
+MIRRORS = {
+    "debian": {
+        "probe": "dists/stable/InRelease",
+        "candidates": [
+            "http://deb.debian.org/debian",
+            "http://ftp.us.debian.org/debian",
+            "http://ftp.de.debian.org/debian",
+            "http://ftp.uk.debian.org/debian",
+            "http://mirrors.kernel.org/debian",
+        ],
+    },
+    "ubuntu": {
+        "probe": "dists/noble/InRelease",
+        "candidates": [
+            "http://archive.ubuntu.com/ubuntu",
+            "http://us.archive.ubuntu.com/ubuntu",
+            "http://de.archive.ubuntu.com/ubuntu",
+            "http://gb.archive.ubuntu.com/ubuntu",
+            "http://mirrors.kernel.org/ubuntu",
+        ],
+    },
+    "fedora": {
+        "probe": "releases/{releasever}/Everything/{arch}/os/repodata/repomd.xml",
+        "candidates": [
+            "https://dl.fedoraproject.org/pub/fedora/linux",
+            "https://mirrors.kernel.org/fedora",
+            "https://ftp.fau.de/fedora/linux",
+            "https://mirror.init7.net/fedora/fedora/linux",
+        ],
+    },
+    "arch": {
+        "probe": "core/os/{arch}/core.db",
+        "candidates": [
+            "https://geo.mirror.pkgbuild.com",
+            "https://mirrors.kernel.org/archlinux",
+            "https://mirror.rackspace.com/archlinux",
+            "https://ftp.fau.de/archlinux",
+        ],
+    },
+}
+
+PROBE_TIMEOUT = 5
+# Bytes read from the probe file at most; enough to measure throughput.
+PROBE_MAX_BYTES = 512 * 1024
+REFERENCE_BYTES = 4 * 1024 * 1024
+
+APT_SOURCES = Path("/etc/apt/sources.list")
+APT_SOURCE_PARTS = Path("/etc/apt/sources.list.d")
+
+def read_os_release(path="/etc/os-release"):
+    values = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                key, _, value = line.strip().partition("=")
+                if key:
+                    values[key] = value.strip('"')
+    except FileNotFoundError:
+        pass
+    return values
+
+def detect_distro():
+    """
+    Returns the MIRRORS key of this machine (derivatives use their parent's mirrors), or None.
+    """
+    os_release = read_os_release()
+    for distro in [os_release.get("ID", "")] + os_release.get("ID_LIKE", "").split():
+        if distro in MIRRORS:
+            return distro
+    return None
+
+def get_probe_url(mirror, probe):
+    probe = probe.format(releasever=read_os_release().get("VERSION_ID", ""), arch=platform.machine())
+    return f"{mirror.rstrip('/')}/{probe}"
+
+def probe(mirror, probe_path, timeout=PROBE_TIMEOUT):
+    """
+    Fetches the probe file from a mirror. Returns {"mirror", "latency", "throughput", "score", "error"},
+    where latency is the time to the response headers and throughput is in bytes per second.
+    """
+    result = {"mirror": mirror, "latency": None, "throughput": None, "score": None, "error": None}
+    start = time.monotonic()
+    try:
+        with urllib.request.urlopen(get_probe_url(mirror, probe_path), timeout=timeout) as response:
+            first_byte = time.monotonic()
+            received = len(response.read(PROBE_MAX_BYTES))
+        finished = time.monotonic()
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    if not received:
+        result["error"] = "empty response"
+        return result
+    result["latency"] = first_byte - start
+    result["throughput"] = received / max(finished - first_byte, 1e-6)
+    result["score"] = result["latency"] + REFERENCE_BYTES / result["throughput"]
+    return result
+
+def select(distro=None, candidates=None):
+    """
+    Probes the candidate mirrors concurrently and returns the fastest as
+    {"distro", "url", "candidates"}, or None if no mirror answered.
+    """
+    distro = distro or detect_distro()
+    if distro not in MIRRORS:
+        print(f"No mirror candidates for '{distro}'. Keeping the configured mirrors.")
+        return None
+    candidates = candidates or MIRRORS[distro]["candidates"]
+    print(f"\n--- Probing {len(candidates)} '{distro}' mirrors ---")
+    with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+        results = list(executor.map(lambda mirror: probe(mirror, MIRRORS[distro]["probe"]), candidates))
+
+    for result in sorted(results, key=lambda result: (result["score"] is None, result["score"])):
+        if result["error"]:
+            print(f"  {result['mirror']}: failed ({result['error']})")
+        else:
+            print(f"  {result['mirror']}: {result['latency'] * 1000:.0f} ms, {result['throughput'] / 1024:.0f} KiB/s")
+    reachable = [result for result in results if not result["error"]]
+    if not reachable:
+        print("WARNING: No mirror answered. Keeping the configured mirrors.")
+        return None
+    best = min(reachable, key=lambda result: result["score"])
+    print(f"Using {best['mirror']} for this run.")
+    # The distro's own candidates are always replaced, also when other candidates were probed.
+    return {"distro": distro, "url": best["mirror"], "candidates": candidates + MIRRORS[distro]["candidates"]}
+
+def normalize(url):
+    return url.rstrip("/")
+
+def rewrite_apt_sources(text, mirror):
+    """
+    Points the one-line ('deb URL ...') and deb822 ('URIs: URL') entries that use
+    a candidate mirror at the selected one.
+    """
+    candidates = {normalize(url) for url in mirror["candidates"]}
+    def replace(match):
+        return match.group(1) + (mirror["url"] if normalize(match.group(2)) in candidates else match.group(2))
+    text = re.sub(r"^(\s*deb(?:-src)?\s+(?:\[[^\]]*\]\s+)?)(\S+)", replace, text, flags=re.MULTILINE)
+    return re.sub(r"^(\s*URIs:\s*)(\S+)", replace, text, flags=re.MULTILINE)
+
+def write_apt_sources(mirror, directory):
+    """
+    Writes rewritten copies of the apt sources to 'directory' and returns the apt
+    options that use them. The lists of the configured mirrors are kept, so apt
+    still works with the system sources after the run.
+    """
+    directory = Path(directory)
+    parts = directory / "sources.list.d"
+    parts.mkdir(parents=True, exist_ok=True)
+    sources = directory / "sources.list"
+    sources.write_text(rewrite_apt_sources(APT_SOURCES.read_text(), mirror) if APT_SOURCES.exists() else "")
+    if APT_SOURCE_PARTS.is_dir():
+        for part in APT_SOURCE_PARTS.iterdir():
+            if part.suffix in (".list", ".sources"):
+                (parts / part.name).write_text(rewrite_apt_sources(part.read_text(), mirror))
+    for path in [directory, parts] + list(parts.iterdir()) + [sources]:
+        os.chmod(path, 0o755 if path.is_dir() else 0o644)
+    return ["-o", f"Dir::Etc::SourceList={sources}", "-o", f"Dir::Etc::SourceParts={parts}",
+            "-o", "APT::Get::List-Cleanup=false"]
+
+def get_dnf_options(mirror):
+    """
+    Returns the options that point the Fedora repos at the selected mirror instead of the metalink.
+    """
+    url = normalize(mirror["url"])
+    return ["--setopt=fedora.metalink=", f"--setopt=fedora.baseurl={url}/releases/$releasever/Everything/$basearch/os/",
+            "--setopt=updates.metalink=", f"--setopt=updates.baseurl={url}/updates/$releasever/Everything/$basearch/"]
+
+def get_pacman_server(mirror):
+    return f"Server = {normalize(mirror['url'])}/$repo/os/$arch"
+
+if __name__ == "__main__":
+    import sys
+    select(sys.argv[1] if len(sys.argv) > 1 else None, sys.argv[2:] or None)
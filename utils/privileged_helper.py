@@ -0,0 +1,375 @@
+import atexit
+import json
+import os
+import re
+import subprocess
+import sys
+import tarfile
+import threading
+from utils import event_stream
+
+# --- CONFIGURATION ---
+# Instead of running 'sudo' for every privileged step (each one a new process and
+# authentication check, and a password prompt once the sudo timestamp expires during
+# a long build), one helper is started with sudo at the beginning of the run. It
+# reads requests from a pipe only this process can write to and runs them as root.
+#
+# A request names one of the OPERATIONS below with its arguments, never a command line:
+# the helper builds the command itself after checking every argument, so a request can
+# only change files below ALLOWED_ROOTS (or the few ALLOWED_FILES), and options that
+# make a program run other commands can never be passed through.
+ALLOWED_ROOTS = ["/opt", "/usr/local"]
+
+# Single files outside ALLOWED_ROOTS that may be written (the VS Code repository).
+ALLOWED_FILES = [
+    "/etc/apt/keyrings/packages.microsoft.gpg",
+    "/etc/apt/sources.list.d/vscode.list",
+    "/etc/yum.repos.d/vscode.repo",
+]
+
+# Groups the user may be added to.
+ALLOWED_GROUPS = ["docker"]
+
+# Package manager arguments, besides package names (see check_package_manager):
+# fixed flags, and the keys that may be set with apt's '-o KEY=VALUE' or dnf's '--setopt=KEY=VALUE'.
+PACKAGE_MANAGER_ARGS = {
+    "apt": ["update", "install", "-y"],
+    "apt-get": ["update", "install", "-y", "--download-only"],
+    "dnf": ["install", "-y", "--downloadonly"],
+    "pacman": ["-S", "-Sw", "-Syu", "-Syuw", "--noconfirm", "--needed"],
+}
+APT_OPTION_KEYS = ["Acquire::Retries", "Dir::Etc::SourceList", "Dir::Etc::SourceParts", "APT::Get::List-Cleanup"]
+DNF_OPTION_KEYS = ["max_parallel_downloads", "retries", "fedora.metalink", "fedora.baseurl",
+                   "updates.metalink", "updates.baseurl"]
+# Lines a tuned pacman.conf (see main.write_tuned_pacman_conf) may add to /etc/pacman.conf.
+PACMAN_CONF = "/etc/pacman.conf"
+PACMAN_CONF_ADDITIONS = re.compile(r"^\s*(ParallelDownloads\s*=\s*\d+|Server\s*=\s*https?://\S+)\s*$")
+
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9@_][A-Za-z0-9@_.+:-]*$")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_helper = None
+_lock = threading.Lock()
+
+# --- Argument checks (run on both sides) ---
+
+def get_client_uid():
+    """
+    Returns the user the helper works for: the one that ran sudo, or this process' user.
+    """
+    return int(os.environ.get("SUDO_UID", os.getuid()))
+
+def resolve(path):
+    """
+    Resolves every component of an absolute path but the last, which operations act on
+    themselves (a symlink is replaced or removed, not followed).
+    """
+    if not isinstance(path, str) or not os.path.isabs(path):
+        raise PermissionError(f"'{path}' is not an absolute path")
+    path = os.path.normpath(path)
+    return os.path.join(os.path.realpath(os.path.dirname(path)), os.path.basename(path))
+
+def check_path(path, allow_files=False):
+    """
+    Returns the resolved path if it is strictly below one of ALLOWED_ROOTS (or one of
+    ALLOWED_FILES, with 'allow_files'); raises PermissionError otherwise.
+    """
+    resolved = resolve(path)
+    if allow_files and resolved in ALLOWED_FILES:
+        return resolved
+    if any(resolved != root and os.path.commonpath([resolved, root]) == root for root in ALLOWED_ROOTS):
+        return resolved
+    raise PermissionError(f"'{path}' is outside {', '.join(ALLOWED_ROOTS)}")
+
+def check_source(path):
+    """
+    Checks a path that is moved into place: it must be allowed, or belong to the client user.
+    """
+    try:
+        return check_path(path)
+    except PermissionError:
+        resolved = resolve(path)
+        if os.lstat(resolved).st_uid != get_client_uid():
+            raise
+        return resolved
+
+def check_name(value, what):
+    if not isinstance(value, str) or not NAME_PATTERN.match(value):
+        raise PermissionError(f"invalid {what} '{value}'")
+    return value
+
+def check_archive(archive):
+    """
+    Checks that every member of a tar archive unpacked at / lands in an allowed directory,
+    including the targets of links, and that it holds only files, directories and links.
+    """
+    with tarfile.open(archive) as tar:
+        for member in tar:
+            path = os.path.normpath("/" + member.name)
+            check_path(path)
+            if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+                raise PermissionError(f"'{member.name}' in the archive is not a file, directory or link")
+            if member.issym():
+                check_path(os.path.normpath(os.path.join(os.path.dirname(path), member.linkname)))
+            elif member.islnk():
+                check_path(os.path.normpath("/" + member.linkname))
+
+def check_apt_sources(path):
+    """
+    Refuses temporary apt sources that would accept unsigned packages.
+    """
+    files = [os.path.join(path, name) for name in os.listdir(path)] if os.path.isdir(path) else [path]
+    for file in files:
+        with open(file, "r") as f:
+            content = f.read().lower()
+        if re.search(r"trusted\s*[=:]\s*yes|allow-insecure|allow-weak|allow-downgrade-to-insecure", content):
+            raise PermissionError(f"'{file}' disables signature checks")
+
+def check_pacman_conf(path):
+    """
+    Refuses a pacman.conf that adds anything but ParallelDownloads and Server lines to the system one.
+    """
+    with open(PACMAN_CONF, "r") as f:
+        system_lines = {line.strip() for line in f}
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip() and line.strip() not in system_lines and not PACMAN_CONF_ADDITIONS.match(line):
+                raise PermissionError(f"'{line.strip()}' in {path} is not allowed")
+
+def check_package_manager(argv):
+    """
+    Checks a package manager command token by token: known flags, tuning options with
+    known keys, and package names.
+    """
+    if not argv or argv[0] not in PACKAGE_MANAGER_ARGS:
+        raise PermissionError(f"'{argv[:1]}' is not a supported package manager")
+    manager = argv[0]
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in PACKAGE_MANAGER_ARGS[manager]:
+            continue
+        if manager in ("apt", "apt-get") and arg == "-o":
+            key, _, value = next(args, "").partition("=")
+            if key not in APT_OPTION_KEYS:
+                raise PermissionError(f"apt option '{key}' is not allowed")
+            if key.startswith("Dir::Etc::") and value != "-":
+                check_apt_sources(value)
+        elif manager == "dnf" and arg.startswith("--setopt="):
+            if arg[len("--setopt="):].partition("=")[0] not in DNF_OPTION_KEYS:
+                raise PermissionError(f"dnf option '{arg}' is not allowed")
+        elif manager == "pacman" and arg == "--config":
+            check_pacman_conf(next(args, ""))
+        else:
+            check_name(arg, "package name")
+    return list(argv)
+
+def op_mkdir(path):
+    # The parent directories of ALLOWED_FILES may be created too
+    if resolve(path) not in [os.path.dirname(file) for file in ALLOWED_FILES]:
+        check_path(path)
+    return ["mkdir", "-p", "--", path]
+
+def op_move(source, destination):
+    return ["mv", "-T", "--", check_source(source), check_path(destination)]
+
+def op_link(target, path):
+    # Only links to a sibling (a version directory), see versioned_install.activate
+    return ["ln", "-sfn", "--", check_name(target, "link target"), check_path(path)]
+
+def op_remove(paths, recursive=False):
+    return ["rm", "-rf" if recursive else "-f", "--", *[check_path(path) for path in paths]]
+
+def op_write(path):
+    # The content is the request's input
+    return ["cp", "--", "/dev/stdin", check_path(path, allow_files=True)]
+
+def op_dearmor(path):
+    return ["gpg", "--batch", "--yes", "--dearmor", "-o", check_path(path, allow_files=True)]
+
+def op_extract(archive):
+    check_archive(archive)
+    return ["tar", "-C", "/", "-xpf", archive, "--no-same-owner"]
+
+def op_unzip(archive, destination):
+    return ["unzip", "-q", "--", archive, "-d", check_path(destination)]
+
+def op_clone(url, destination):
+    if not re.match(r"^https://\S+$", url):
+        raise PermissionError(f"'{url}' is not an https:// URL")
+    # Only https, also for submodules and redirects
+    return ["git", "-c", "protocol.allow=never", "-c", "protocol.https.allow=always",
+            "clone", "--depth", "1", "--", url, check_path(destination)]
+
+def op_gem_install(gems):
+    return ["gem", "install", *[check_name(gem, "gem") for gem in gems]]
+
+def op_service(action, name):
+    if action not in ("stop", "disable"):
+        raise PermissionError(f"service action '{action}' is not allowed")
+    return ["systemctl", action, check_name(name, "service")]
+
+def op_add_to_group(user, group):
+    if group not in ALLOWED_GROUPS:
+        raise PermissionError(f"group '{group}' is not allowed")
+    return ["gpasswd", "-a", check_name(user, "user"), group]
+
+# Operation name -> function that checks its arguments and returns the command that carries it out.
+OPERATIONS = {
+    "mkdir": op_mkdir,
+    "move": op_move,
+    "link": op_link,
+    "remove": op_remove,
+    "write": op_write,
+    "dearmor": op_dearmor,
+    "extract": op_extract,
+    "unzip": op_unzip,
+    "clone": op_clone,
+    "gem_install": op_gem_install,
+    "service": op_service,
+    "add_to_group": op_add_to_group,
+    "packages": check_package_manager,
+}
+
+def build_command(operation, arguments):
+    """
+    Returns the command of a request. Raises PermissionError for anything not allowed.
+    """
+    if operation not in OPERATIONS:
+        raise PermissionError(f"unknown operation '{operation}'")
+    try:
+        return OPERATIONS[operation](**arguments)
+    except TypeError as e:
+        raise PermissionError(f"bad arguments for '{operation}': {e}")
+
+# --- Helper side (runs as root) ---
+
+def handle(request):
+    """
+    Runs one request and returns the response sent back to the client.
+    Without "capture" the output goes to the helper's stderr, i.e. the user's terminal.
+    """
+    try:
+        argv = build_command(request["op"], request["args"])
+    except (PermissionError, OSError, tarfile.TarError) as e:
+        return {"returncode": 126, "stdout": "", "stderr": f"privileged helper: {request.get('op')} refused: {e}\n"}
+    # The command must never read from stdin, which is the request pipe.
+    options = {"input": request["input"]} if request.get("input") is not None else {"stdin": subprocess.DEVNULL}
+    if request.get("capture"):
+        options["stdout"] = subprocess.PIPE
+        options["stderr"] = subprocess.STDOUT if request.get("merge_stderr") else subprocess.PIPE
+    else:
+        options["stdout"] = options["stderr"] = sys.stderr
+    try:
+        result = subprocess.run(argv, cwd=request.get("cwd"), text=True, **options)
+    except OSError as e:
+        return {"returncode": 127, "stdout": "", "stderr": f"{e}\n"}
+    return {"returncode": result.returncode, "stdout": result.stdout or "", "stderr": result.stderr or ""}
+
+def serve():
+    """
+    Answers one JSON request per line on stdin with one JSON response per line on stdout.
+    """
+    print("ready", flush=True)
+    for line in sys.stdin:
+        response = handle(json.loads(line))
+        print(json.dumps(response), flush=True)
+
+# --- Client side ---
+
+def start():
+    """
+    Starts the helper, asking for the sudo password once. Returns True if it is running;
+    otherwise run() falls back to calling sudo for every command.
+    """
+    global _helper
+    if _helper:
+        return True
+    # Run as a module from the project root, so the helper can import the utils package too
+    command = [sys.executable, "-m", "utils.privileged_helper", "--serve"]
+    if os.geteuid() != 0:
+        if subprocess.run(["sudo", "-v"]).returncode != 0:
+            print("WARNING: Could not get sudo credentials. Privileged steps will ask for them again.")
+            return False
+        command = ["sudo", "-n"] + command
+    try:
+        helper = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+                                  cwd=PROJECT_ROOT)
+        if helper.stdout.readline().strip() != "ready":
+            raise OSError("the helper did not start")
+    except OSError as e:
+        print(f"WARNING: Could not start the privileged helper ({e}). Falling back to plain sudo.")
+        return False
+    _helper = helper
+    atexit.register(stop)
+    print("Privileged helper started.")
+    return True
+
+def is_running():
+    return _helper is not None
+
+def stop():
+    global _helper
+    if _helper:
+        _helper.stdin.close()
+        _helper.wait()
+        _helper = None
+
+def report(operation, arguments, result, start):
+    """
+    Emits the process_exit event of an operation, and a download event for a successful clone.
+    """
+    event_stream.process_exited(result.args, result.returncode, start)
+    if operation == "clone" and result.returncode == 0:
+        event_stream.downloaded(arguments["url"], start, os.path.join(arguments["destination"], ".git"))
+
+def run(operation, cwd=None, check=False, capture_output=False, stdout=None, stderr=None, input=None, **arguments):
+    """
+    Runs an operation as root, e.g. run("move", source=..., destination=..., check=True).
+    Supports capture_output, a file object as stdout (with stderr=subprocess.STDOUT
+    to merge both into it), input and check, like subprocess.run(text=True).
+    Returns a CompletedProcess whose args are the command the operation ran.
+    """
+    # Checked here too, so a refused request fails the same way with and without the helper
+    try:
+        argv = ["sudo"] + build_command(operation, arguments)
+    except (PermissionError, OSError, tarfile.TarError) as e:
+        raise PermissionError(f"privileged helper: {operation} refused: {e}")
+    start = event_stream.process_spawned(argv, cwd)
+    if not _helper:
+        result = subprocess.run(argv, cwd=cwd, capture_output=capture_output,
+                                stdout=stdout, stderr=stderr, input=input, text=True)
+        report(operation, arguments, result, start)
+        if check:
+            result.check_returncode()
+        return result
+
+    capture = capture_output or stdout is not None
+    request = {"op": operation, "args": arguments, "cwd": str(cwd) if cwd else None, "input": input,
+               "capture": capture, "merge_stderr": stderr == subprocess.STDOUT}
+    with _lock:
+        _helper.stdin.write(json.dumps(request) + "\n")
+        _helper.stdin.flush()
+        line = _helper.stdout.readline()
+    if not line:
+        raise OSError("The privileged helper exited unexpectedly.")
+    response = json.loads(line)
+
+    result = subprocess.CompletedProcess(argv, response["returncode"], None, None)
+    report(operation, arguments, result, start)
+    if capture_output:
+        result.stdout, result.stderr = response["stdout"], response["stderr"]
+    elif hasattr(stdout, "write"):
+        stdout.write(response["stdout"] + response["stderr"])
+        stdout.flush()
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, result.args, response["stdout"], response["stderr"])
+    return result
+
+if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        serve()
+    else:
+        start()
+        print(run("mkdir", path="/opt/autoinstaller-helper-test", check=True).args)
+        run("remove", paths=["/opt/autoinstaller-helper-test"], recursive=True, check=True)
@@ -0,0 +1,73 @@
+import json
+import os
+import time
+from pathlib import Path
+from utils import event_stream
+
+# --- CONFIGURATION ---
+# Completed steps of the current provisioning run. A re-run after a crash, reboot
+# or sudo timeout picks up at the first step that is not in here.
+# The journal is cleared when a run finishes, so the next run starts from scratch.
+JOURNAL_FILE = Path.home() / ".local" / "share" / "autoinstaller" / "journal.json"
+
+def load():
+    try:
+        with open(JOURNAL_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save(journal):
+    """
+    Writes the journal atomically and flushes it to disk, so a crash right
+    after a step never loses the record of it.
+    """
+    JOURNAL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = JOURNAL_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(journal, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, JOURNAL_FILE)
+
+def get(key):
+    return load().get(key)
+
+def put(key, value):
+    journal = load()
+    journal[key] = value
+    save(journal)
+
+def is_done(key, fingerprint=None):
+    """
+    Returns True if the step was completed (with the same fingerprint, if given).
+    """
+    entry = get(key)
+    return bool(entry) and entry.get("fingerprint") == fingerprint
+
+def mark_done(key, fingerprint=None):
+    put(key, {"done_at": int(time.time()), "fingerprint": fingerprint})
+
+def remove(key):
+    journal = load()
+    if journal.pop(key, None) is not None:
+        save(journal)
+
+def clear():
+    JOURNAL_FILE.unlink(missing_ok=True)
+
+def run_step(key, function, fingerprint=None):
+    """
+    Runs function() unless the step is already journaled, then journals it.
+    Returns True if the step ran or was already done, False if it returned False.
+    """
+    if is_done(key, fingerprint):
+        print(f"Step '{key}' already completed in a previous run. Skipping.")
+        event_stream.emit("skip", stage=key, reason="journaled")
+        return True
+    with event_stream.stage(key) as stage:
+        if function() is False:
+            stage["status"] = "failed"
+            return False
+    mark_done(key, fingerprint)
+    return True
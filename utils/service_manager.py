@@ -1,5 +1,6 @@
 import subprocess
 import shutil
+from utils import privileged_helper
 
 # --- CONFIGURATION ---
 # A list of services that are installed but should not be running on boot.
@@ -27,15 +28,13 @@ def disable_startup_services():
 
             if is_active:
                 print(f"Stopping '{service}'...")
-                stop_command = ["sudo", "systemctl", "stop", service]
-                subprocess.run(stop_command, check=True, capture_output=True, text=True)
+                privileged_helper.run("service", action="stop", name=service, check=True, capture_output=True)
             else:
                 print(f"Service '{service}' is already stopped.")
 
             # Disable the service from starting on boot
             print(f"Disabling '{service}' from starting on boot...")
-            disable_command = ["sudo", "systemctl", "disable", service]
-            subprocess.run(disable_command, check=True, capture_output=True, text=True)
+            privileged_helper.run("service", action="disable", name=service, check=True, capture_output=True)
             print(f"'{service}' is now stopped and disabled.")
 
         except subprocess.CalledProcessError as e:
@@ -0,0 +1,356 @@
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from utils import artifact_store, build_profiles, build_workspace, event_stream, hashcat_kernels
+from utils import run_journal, staged_install, version_tracker, versioned_install
+
+# --- CONFIGURATION ---
+# Every tool built from a git source is described by a recipe and built by install() below.
+# Adding a tool means adding a recipe here (and an entry in main.INSTALLERS).
+#
+# "name":          Short name, also used for logs, workspaces and the version tracker.
+# "display_name":  A friendly name for logging.
+# "repo":          The git repository, cloned with '--depth 1'.
+# "requires":      (Optional) Commands that must be in the PATH. Defaults to git, gcc and make.
+# "check_command": Command that tells whether the tool is installed (not used with "deploy").
+# "prefix":        (Optional) Installation prefix, substituted for '{prefix}'. Defaults to /usr/local.
+# "build_dir":     (Optional) Sub-directory of the clone the steps run in.
+# "build":         Commands run as the current user. 'make' always gets '-j<cpus>'.
+# "install":       (Optional) Commands run after the build that install into the staging
+#                  directory '{destdir}', e.g. 'make install DESTDIR={destdir}'. The staged files
+#                  are then copied to the live system by staged_install (only the changed ones).
+# "config_files":  (Optional) Staged files that are installed once and never overwritten.
+# "deploy":        (Optional) {"source": <dir in clone>, "install_dir": <dir>} moves the built
+#                  application to a versioned /opt directory instead of running "install".
+# "profiles":      (Optional) True if build_profiles applies; "profile_flags" adds configure flags per profile.
+# "post_build":    (Optional) Hook called as post_build(clone_path, **options) before installing.
+# "artifacts":     Files that must exist afterwards, otherwise the installation counts as failed.
+# "hint":          (Optional) Printed when a step fails.
+#
+# With an artifact store (see utils/artifact_store.py), the built files (the staged tree, or the
+# deployed application) are published after a successful build and fetched instead of building
+# on other hosts with the same distro, architecture, commit and build inputs.
+
+DEFAULT_PREFIX = "/usr/local"
+DEFAULT_REQUIRES = ["git", "gcc", "make"]
+
+RECIPES = [
+    {
+        "name": "nmap",
+        "display_name": "Nmap",
+        "repo": "https://github.com/nmap/nmap.git",
+        "check_command": "nmap",
+        # We add --with-libssh2 to ensure it builds with SSH support for NSE
+        "build": [["./configure", "--prefix={prefix}", "--with-libssh2"], ["make"]],
+        "install": [["make", "install", "DESTDIR={destdir}"]],
+        "artifacts": ["{prefix}/bin/nmap"],
+        "hint": "Ensure build dependencies like 'libpcap-dev' and 'libssh2-1-dev' are installed.",
+    },
+    {
+        "name": "rlwrap",
+        "display_name": "rlwrap",
+        "repo": "https://github.com/hanslub42/rlwrap.git",
+        "requires": ["git", "gcc", "make", "autoconf"],
+        "check_command": "rlwrap",
+        "build": [["autoreconf", "--install"], ["./configure", "--prefix={prefix}"], ["make"]],
+        "install": [["make", "install", "DESTDIR={destdir}"]],
+        "artifacts": ["{prefix}/bin/rlwrap"],
+        "hint": "Ensure build dependencies like 'libreadline-dev' and 'autoconf' are installed.",
+    },
+    {
+        "name": "proxychains",
+        "display_name": "ProxyChains-NG",
+        "repo": "https://github.com/rofl0r/proxychains-ng.git",
+        # The executable is often named 'proxychains4'
+        "check_command": "proxychains4",
+        "build": [["./configure", "--prefix={prefix}"], ["make"]],
+        # Ship a default config file, but never overwrite an existing one
+        "install": [["make", "install", "DESTDIR={destdir}"],
+                    ["install", "-D", "-m", "644", "src/proxychains.conf", "{destdir}/etc/proxychains.conf"]],
+        "config_files": ["/etc/proxychains.conf"],
+        "artifacts": ["{prefix}/bin/proxychains4"],
+    },
+    {
+        "name": "tmux",
+        "display_name": "tmux",
+        "repo": "https://github.com/tmux/tmux.git",
+        "check_command": "tmux",
+        "build": [["sh", "autogen.sh"], ["./configure", "--prefix={prefix}"], ["make"]],
+        "install": [["make", "install", "DESTDIR={destdir}"]],
+        "artifacts": ["{prefix}/bin/tmux"],
+        "hint": "Ensure build dependencies like 'libevent-dev' and 'ncurses-dev' are installed.",
+    },
+    {
+        "name": "xclip",
+        "display_name": "xclip",
+        "repo": "https://github.com/astrand/xclip.git",
+        "requires": ["git", "gcc", "make", "autoreconf"],
+        "check_command": "xclip",
+        "build": [["autoreconf", "-i"], ["./configure", "--prefix={prefix}"], ["make"]],
+        "install": [["make", "install", "DESTDIR={destdir}"]],
+        "artifacts": ["{prefix}/bin/xclip"],
+        "hint": "Ensure build dependencies like 'libx11-dev' are installed.",
+    },
+    {
+        "name": "john",
+        "display_name": "John the Ripper",
+        "repo": "https://github.com/openwall/john.git",
+        "build_dir": "src",
+        "build": [["./configure"], ["make", "-s"]],
+        "profiles": True,
+        # Let OpenMP also parallelize the fast hash formats (NTLM, raw MD5, ...)
+        "profile_flags": {"max": ["--enable-openmp-for-fast-formats"]},
+        # The PATH will be handled by the shell configurator scripts.
+        "deploy": {"source": "run", "install_dir": "/opt/john"},
+        "artifacts": ["/opt/john/current/john"],
+    },
+    {
+        "name": "hashcat",
+        "display_name": "Hashcat",
+        "repo": "https://github.com/hashcat/hashcat.git",
+        # Compile the binary inside the directory. Do NOT install: the clone is the
+        # full, self-contained application and is moved to /opt/hashcat as a whole.
+        "build": [["make"]],
+        "profiles": True,
+        "post_build": hashcat_kernels.post_build,
+        "deploy": {"source": ".", "install_dir": "/opt/hashcat"},
+        "artifacts": ["/opt/hashcat/current/hashcat"],
+        "hint": "Ensure build dependencies like 'libgmp-dev' and 'ocl-icd-opencl-dev' are installed.",
+    },
+]
+
+# Full output of every build step goes here instead of being discarded.
+LOG_DIR = Path.home() / ".local" / "share" / "autoinstaller" / "logs"
+
+# Compiler cache shared by all builds, used when 'ccache' is installed.
+CCACHE_DIR = Path.home() / ".cache" / "autoinstaller" / "ccache"
+
+def get_recipe(name):
+    return next(recipe for recipe in RECIPES if recipe["name"] == name)
+
+def get_install_dir(recipe):
+    return Path(recipe["deploy"]["install_dir"]) if "deploy" in recipe else None
+
+def is_installed(recipe):
+    if "deploy" in recipe:
+        return versioned_install.is_installed(get_install_dir(recipe))
+    return shutil.which(recipe["check_command"]) is not None
+
+def expand(command, recipe, destdir=""):
+    prefix = recipe.get("prefix", DEFAULT_PREFIX)
+    return [arg.replace("{prefix}", prefix).replace("{destdir}", str(destdir)) for arg in command]
+
+def get_build_env(recipe, profile):
+    """
+    Returns the environment for the build steps: profile CFLAGS/LDFLAGS and ccache.
+    """
+    env = build_profiles.get_build_env(profile) if recipe.get("profiles") else os.environ.copy()
+    if shutil.which("ccache"):
+        CCACHE_DIR.mkdir(parents=True, exist_ok=True)
+        env["CCACHE_DIR"] = str(CCACHE_DIR)
+        env.setdefault("CC", "ccache gcc")
+        env.setdefault("CXX", "ccache g++")
+    return env
+
+def prepare_step(command, recipe, profile):
+    """
+    Applies the engine-wide rules to a recipe step: prefix substitution,
+    parallel make and per-profile configure flags.
+    """
+    command = expand(command, recipe)
+    if command[0] == "make" and not any(arg.startswith("-j") for arg in command):
+        command.append(f"-j{os.cpu_count()}")
+    if command[0] == "./configure" and recipe.get("profiles"):
+        command.extend(recipe.get("profile_flags", {}).get(profile, []))
+    return command
+
+def run_step(command, cwd, log_path, env=None):
+    """
+    Runs one step, appending its output to the tool's log file.
+    """
+    with open(log_path, "a") as log:
+        log.write(f"\n$ {' '.join(command)}  (in {cwd})\n")
+        log.flush()
+        start = event_stream.process_spawned(command, cwd)
+        returncode = subprocess.run(command, cwd=str(cwd), env=env, stdout=log, stderr=subprocess.STDOUT).returncode
+        event_stream.process_exited(command, returncode, start)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command)
+
+def tail(log_path, lines=20):
+    try:
+        return "".join(Path(log_path).read_text(errors="replace").splitlines(keepends=True)[-lines:])
+    except OSError:
+        return ""
+
+def is_shareable(recipe, profile):
+    """
+    Returns True if builds of this recipe can be shared through the artifact store.
+    """
+    return artifact_store.is_enabled() and (not recipe.get("profiles") or build_profiles.get_profile(profile)["portable"])
+
+def get_artifact_inputs(recipe, profile, options):
+    """
+    Returns everything besides the commit and platform that changes what a recipe builds.
+    """
+    inputs = {"build": recipe["build"], "install": recipe.get("install", []), "prefix": recipe.get("prefix", DEFAULT_PREFIX),
+              "deploy": recipe.get("deploy"), "options": options if recipe.get("post_build") else {}}
+    if recipe.get("profiles"):
+        inputs["profile"] = build_profiles.get_profile(profile)
+        inputs["profile_flags"] = recipe.get("profile_flags", {}).get(profile, [])
+    return inputs
+
+def discard_resume_state(name):
+    """
+    Drops the journal entry and the kept workspace of an interrupted build.
+    """
+    state = run_journal.get(f"build:{name}")
+    if state:
+        build_workspace.remove(state["workspace"])
+        run_journal.remove(f"build:{name}")
+
+def install(name, force=False, profile=build_profiles.DEFAULT_PROFILE, **options):
+    """
+    Clones, builds and installs a tool from its recipe.
+    With force=True an existing installation is rebuilt (used by update mode).
+    'profile' selects compiler tuning for recipes with "profiles"; other
+    keyword options are passed to the recipe's post_build hook.
+
+    Every completed step (clone, each build step, deploy, each install step) is
+    journaled together with a workspace that is kept until the build succeeds,
+    so a re-run after a crash continues at the first incomplete step.
+
+    If the artifact store has a build of the upstream commit, it is installed
+    instead of building; a local build is published to the store.
+    """
+    recipe = get_recipe(name)
+    display_name = recipe["display_name"]
+    print(f"\n--- Installing '{display_name}' from source ---")
+
+    if is_installed(recipe) and not force:
+        discard_resume_state(name)
+        print(f"'{display_name}' is already installed. Skipping.")
+        event_stream.emit("skip", stage=f"build:{name}", reason="already installed")
+        return
+
+    requires = recipe.get("requires", DEFAULT_REQUIRES)
+    if not all(shutil.which(cmd) for cmd in requires):
+        print(f"ERROR: Build tools ({', '.join(requires)}) not found. Cannot build '{name}'.")
+        return
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{name}.log"
+
+    journal_key = f"build:{name}"
+    state = run_journal.get(journal_key)
+    resumable = bool(state and Path(state["workspace"]).is_dir() and state.get("profile") == profile)
+    event_stream.emit("cache", cache="build-workspace", key=name, hit=resumable)
+    if resumable:
+        print(f"Resuming the interrupted build in {state['workspace']} after step '{state['steps'][-1] if state['steps'] else 'none'}'.")
+    else:
+        discard_resume_state(name)
+        state = {"workspace": build_workspace.create(name, resumable=True), "profile": profile, "steps": []}
+        run_journal.put(journal_key, state)
+        with open(log_path, "w") as log:
+            log.write(f"# {display_name} build started {time.ctime()}\n")
+
+    def step(label, function):
+        if label in state["steps"]:
+            return
+        function()
+        state["steps"].append(label)
+        run_journal.put(journal_key, state)
+
+    tmpdir = state["workspace"]
+    try:
+        source_path = Path(tmpdir) / name
+        build_path = source_path / recipe.get("build_dir", ".")
+        destdir = Path(tmpdir) / "destdir"
+        artifact_path = Path(tmpdir) / "artifact"
+        shareable = is_shareable(recipe, profile)
+        details = build_profiles.describe(profile) if recipe.get("profiles") else {}
+
+        if shareable:
+            def fetch_artifact():
+                try:
+                    commit = version_tracker.get_upstream_commit(recipe["repo"])
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                    # Only a cache miss: the clone below finds the commit
+                    print(f"WARNING: Could not query the upstream commit of '{display_name}': {e}")
+                    state["artifact"] = False
+                    return
+                state["commit"] = commit
+                key = artifact_store.make_key(name, commit, get_artifact_inputs(recipe, profile, options))
+                state["artifact"] = artifact_store.fetch(key, artifact_path)
+            step("artifact", fetch_artifact)
+
+        def deploy(built_path):
+            install_dir = get_install_dir(recipe)
+            print(f"Moving compiled application to {install_dir} using sudo...")
+            label = f"{state['commit'][:12]}-{profile}" if recipe.get("profiles") else state["commit"][:12]
+            state["version"] = versioned_install.deploy(built_path, install_dir, label)
+
+        if state.get("artifact"):
+            if "deploy" in recipe:
+                step("deploy", lambda: deploy(artifact_path))
+            else:
+                step("sync", lambda: staged_install.sync(name, artifact_path, state["commit"], recipe.get("config_files", [])))
+        else:
+            def clone():
+                print(f"Cloning {display_name} repository...")
+                shutil.rmtree(source_path, ignore_errors=True)
+                start = time.monotonic()
+                run_step(["git", "clone", "--depth", "1", recipe["repo"], str(source_path)], tmpdir, log_path)
+                event_stream.downloaded(recipe["repo"], start, source_path / ".git")
+                state["commit"] = version_tracker.get_local_commit(source_path)
+            step("clone", clone)
+
+            env = get_build_env(recipe, profile)
+            print(f"Building '{display_name}'" + (f" (profile '{profile}', SIMD level: {details['simd']})" if details else "") + "...")
+            for i, command in enumerate(recipe["build"]):
+                step(f"build:{i}", lambda command=command: run_step(prepare_step(command, recipe, profile), build_path, log_path, env))
+
+            if recipe.get("post_build"):
+                step("post_build", lambda: recipe["post_build"](source_path, **options))
+
+            if "deploy" in recipe:
+                step("deploy", lambda: deploy(source_path / recipe["deploy"]["source"]))
+            if recipe.get("install"):
+                for i, command in enumerate(recipe["install"]):
+                    def install_step(command=command):
+                        print(f"Running '{' '.join(expand(command, recipe, destdir))}'...")
+                        run_step(expand(command, recipe, destdir), build_path, log_path)
+                    step(f"install:{i}", install_step)
+                step("sync", lambda: staged_install.sync(name, destdir, state["commit"], recipe.get("config_files", [])))
+        commit = state["commit"]
+
+        missing = [path for path in (expand(recipe.get("artifacts", []), recipe)) if not Path(path).exists()]
+        if missing:
+            print(f"\nERROR: '{display_name}' did not produce {', '.join(missing)}. See {log_path}.")
+            discard_resume_state(name)
+            return
+
+        if shareable and not state.get("artifact"):
+            inputs = get_artifact_inputs(recipe, profile, options)
+            built_path = get_install_dir(recipe) / versioned_install.CURRENT_LINK if "deploy" in recipe else destdir
+            artifact_store.publish(artifact_store.make_key(name, commit, inputs), built_path, name, commit, inputs)
+
+        version_tracker.record_install(name, commit, state.get("version"), **details)
+        discard_resume_state(name)
+        print(f"'{display_name}' installed successfully.")
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: A command failed during '{name}' installation: {e}")
+        print(f"Last lines of {log_path}:\n{tail(log_path)}")
+        if recipe.get("hint"):
+            print(f"HINT: {recipe['hint']}")
+        print("The workspace is kept; the next run resumes at this step.")
+    except Exception as e:
+        print(f"\nAn unexpected error occurred during '{name}' installation: {e}")
+
+if __name__ == "__main__":
+    import sys
+    for tool_name in sys.argv[1:] or [recipe["name"] for recipe in RECIPES]:
+        install(tool_name)
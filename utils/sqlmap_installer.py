@@ -2,18 +2,24 @@ import os
 import shutil
 import subprocess
 from pathlib import Path
+from utils import privileged_helper, version_tracker, versioned_install
 
-def install():
+REPO_URL = "https://github.com/sqlmapproject/sqlmap.git"
+INSTALL_DIR = Path("/opt/sqlmap")
+
+def install(force=False):
     """
-    Clones sqlmap to /opt/sqlmap and creates a symbolic link.
+    Clones sqlmap to a new version under /opt/sqlmap, switches /opt/sqlmap/current
+    to it and creates a symbolic link.
+    With force=True an existing installation is replaced (used by update mode).
     """
     print("\n--- Installing 'sqlmap' ---")
     
-    install_dir = Path("/opt/sqlmap")
+    install_dir = INSTALL_DIR
     local_bin = Path.home() / ".local" / "bin"
     symlink_path = local_bin / "sqlmap"
     
-    if install_dir.exists() and symlink_path.exists():
+    if versioned_install.is_installed(install_dir) and symlink_path.exists() and not force:
         print("'sqlmap' appears to be already installed. Skipping.")
         return
 
@@ -21,15 +27,19 @@ def install():
         print("ERROR: 'git' not found. Cannot install 'sqlmap'.")
         return
 
+    staging_path = None
     try:
         print(f"Cloning sqlmap repository to {install_dir} using sudo...")
-        repo_url = "https://github.com/sqlmapproject/sqlmap.git"
-        # We need to clone as root directly into the final directory
-        command = ["sudo", "git", "clone", "--depth", "1", repo_url, str(install_dir)]
-        subprocess.run(command, check=True)
+        repo_url = REPO_URL
+        # Clone as root next to the live versions, so activating it is a cheap rename
+        staging_path = versioned_install.staging_dir(install_dir, "sqlmap")
+        privileged_helper.run("clone", url=repo_url, destination=str(staging_path), check=True)
+        commit = version_tracker.get_local_commit(staging_path)
+        version = versioned_install.deploy(staging_path, install_dir, commit[:12])
+        version_tracker.record_install("sqlmap", commit, version)
 
-        # Create a symbolic link to the main script
-        sqlmap_executable = install_dir / "sqlmap.py"
+        # Create a symbolic link to the main script (through 'current', so it survives upgrades)
+        sqlmap_executable = install_dir / versioned_install.CURRENT_LINK / "sqlmap.py"
         print(f"Creating symbolic link at {symlink_path}")
         local_bin.mkdir(exist_ok=True)
         if symlink_path.exists() or symlink_path.is_symlink():
@@ -41,6 +51,9 @@ def install():
         print(f"\nERROR: A command failed during 'sqlmap' installation: {e}")
     except Exception as e:
         print(f"\nAn unexpected error occurred during 'sqlmap' installation: {e}")
+    finally:
+        if staging_path and staging_path.exists():
+            privileged_helper.run("remove", paths=[str(staging_path)], recursive=True)
 
 if __name__ == "__main__":
     install()
\ No newline at end of file
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from utils import privileged_helper, version_tracker
+
+# --- CONFIGURATION ---
+# Source builds run 'make install DESTDIR=<staging dir>' instead of installing straight into the
+# live prefix. The staged tree is compared with the live files and only new or changed files are
+# copied, and the list of installed files is kept as a manifest per tool:
+#   <MANIFEST_DIR>/<tool>.json  {"tool", "commit", "installed_at", "files": {path: entry}}
+# where an entry is {"sha256", "size", "mode"} for a file or {"link": target} for a symlink.
+MANIFEST_DIR = Path.home() / ".local" / "share" / "autoinstaller" / "manifests"
+
+# Every staged tree is also kept as a tar archive, so a rollback only has to copy the files
+# that differ from the previous installation. Archives beyond this many are deleted.
+ARCHIVE_DIR = Path.home() / ".cache" / "autoinstaller" / "staged"
+RETAIN_ARCHIVES = 3
+
+def get_manifest_path(tool):
+    return MANIFEST_DIR / f"{tool}.json"
+
+def load_manifest(tool):
+    try:
+        with open(get_manifest_path(tool), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_manifest(tool, manifest):
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = get_manifest_path(tool).with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, get_manifest_path(tool))
+
+def file_hash(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def build_manifest(destdir):
+    """
+    Returns {live path: entry} for every file and symlink in a staged tree.
+    """
+    destdir = Path(destdir)
+    files = {}
+    for root, dirs, names in os.walk(destdir):
+        # Symlinks to directories are listed in 'dirs' and are not followed by os.walk
+        for name in names + [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            path = Path(root) / name
+            live_path = "/" + str(path.relative_to(destdir))
+            if path.is_symlink():
+                files[live_path] = {"link": os.readlink(path)}
+            else:
+                info = path.stat()
+                files[live_path] = {"sha256": file_hash(path), "size": info.st_size, "mode": stat.S_IMODE(info.st_mode)}
+    return files
+
+def is_unchanged(path, entry):
+    """
+    Returns True if the live file already matches a manifest entry.
+    """
+    try:
+        if "link" in entry:
+            return os.path.islink(path) and os.readlink(path) == entry["link"]
+        info = os.lstat(path)
+        if not stat.S_ISREG(info.st_mode) or info.st_size != entry["size"] or stat.S_IMODE(info.st_mode) != entry["mode"]:
+            return False
+        return file_hash(path) == entry["sha256"]
+    except OSError:
+        return False
+
+def copy_files(destdir, paths):
+    """
+    Copies the given live paths from the staged tree into place with one privileged tar call.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".tar") as archive:
+        file_list = "\0".join(path.lstrip("/") for path in paths)
+        subprocess.run(["tar", "-C", str(destdir), "-cf", archive.name, "--null", "-T", "-"],
+                       input=file_list.encode(), check=True, capture_output=True)
+        privileged_helper.run("extract", archive=archive.name, check=True)
+
+def remove_files(paths):
+    if paths:
+        privileged_helper.run("remove", paths=sorted(paths), check=True)
+
+def archive_tree(tool, destdir, commit):
+    """
+    Keeps the staged tree as <ARCHIVE_DIR>/<tool>/<time in ns>-<commit>.tar and prunes old archives.
+    """
+    tool_dir = ARCHIVE_DIR / tool
+    tool_dir.mkdir(parents=True, exist_ok=True)
+    archive = tool_dir / f"{time.time_ns()}-{commit}.tar"
+    subprocess.run(["tar", "-C", str(destdir), "-cf", str(archive), "."], check=True, capture_output=True)
+    for old_archive in list_archives(tool)[:-RETAIN_ARCHIVES]:
+        old_archive.unlink()
+
+def list_archives(tool):
+    """
+    Returns the archived staged trees of a tool, oldest first.
+    """
+    tool_dir = ARCHIVE_DIR / tool
+    return sorted(tool_dir.glob("*.tar")) if tool_dir.is_dir() else []
+
+def sync(tool, destdir, commit, preserve=(), archive=True):
+    """
+    Brings the live files in line with a staged tree: copies new and changed files,
+    removes files the previous installation had but this one does not, and saves
+    the manifest. Paths in 'preserve' (config files) are never overwritten once they exist.
+    """
+    new_files = build_manifest(destdir)
+    old_manifest = load_manifest(tool) or {"files": {}}
+
+    changed = [path for path, entry in sorted(new_files.items())
+               if not (path in preserve and os.path.lexists(path)) and not is_unchanged(path, entry)]
+    removed = [path for path in old_manifest["files"] if path not in new_files and path not in preserve]
+
+    print(f"Installing {len(changed)} new or changed of {len(new_files)} files, removing {len(removed)} stale files...")
+    if changed:
+        copy_files(destdir, changed)
+    remove_files([path for path in removed if os.path.lexists(path)])
+
+    save_manifest(tool, {"tool": tool, "commit": commit, "installed_at": int(time.time()), "files": new_files})
+    if archive:
+        archive_tree(tool, destdir, commit)
+    return changed
+
+def uninstall(tool, preserve=()):
+    """
+    Removes every file of the tool's manifest. Returns False if there is no manifest.
+    """
+    manifest = load_manifest(tool)
+    if not manifest:
+        print(f"No manifest for '{tool}'; it was not installed through a staged install.")
+        return False
+    paths = [path for path in manifest["files"] if path not in preserve and os.path.lexists(path)]
+    print(f"Removing {len(paths)} files of '{tool}'...")
+    remove_files(paths)
+    get_manifest_path(tool).unlink()
+    return True
+
+def rollback(tool, preserve=()):
+    """
+    Re-installs the previous archived staged tree, copying only the files that differ.
+    Returns the commit rolled back to, or None if there is no previous installation.
+    """
+    archives = list_archives(tool)
+    if len(archives) < 2:
+        print(f"No previous installation of '{tool}' to roll back to.")
+        return None
+    current, previous = archives[-1], archives[-2]
+    commit = previous.stem.split("-", 1)[1]
+    with tempfile.TemporaryDirectory() as destdir:
+        subprocess.run(["tar", "-C", destdir, "-xf", str(previous)], check=True, capture_output=True)
+        sync(tool, destdir, commit, preserve, archive=False)
+    # The previous tree is the current one now
+    current.unlink()
+    version_tracker.record_install(tool, commit)
+    print(f"Rolled back '{tool}' to {commit[:12]}.")
+    return commit
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+def configure():
+    """
+    Creates a default tmux configuration for the current user.
+    """
+    print("\n--- Configuring tmux (~/.config/tmux/tmux.conf) ---")
+
+    config_content = """
+# Unbind the default prefix and Set new prefix to Ctrl+z
+unbind C-b
+set-option -g prefix C-x
+
+bind c new-window -c '#{pane_current_path}'
+
+# set -g mouse on
+
+set -g history-limit 5000
+
+setw -g mode-keys vi
+bind -T copy-mode-vi v send -X begin-selection
+bind -T copy-mode-vi C-v send -X rectangle-toggle
+bind -T copy-mode-vi y send -X copy-pipe-and-cancel "xclip -selection clipboard -in"
+bind -T copy-mode-vi Escape send -X cancel
+
+bind | split-window -h
+"""
+    
+    config_dir = Path.home() / ".config" / "tmux"
+    config_file = config_dir / "tmux.conf"
+
+    try:
+        if config_file.exists():
+            print(f"'{config_file}' already exists. Skipping configuration to avoid overwriting.")
+        else:
+            print(f"Creating default configuration at '{config_file}'...")
+            config_dir.mkdir(parents=True, exist_ok=True)
+            config_file.write_text(config_content)
+            print("tmux configuration created successfully.")
+            
+    except Exception as e:
+        print(f"\nAn error occurred during tmux configuration: {e}")
+
+if __name__ == "__main__":
+    configure()
\ No newline at end of file
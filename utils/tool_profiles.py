@@ -0,0 +1,54 @@
+import argparse
+
+# --- CONFIGURATION ---
+# Tags group the tools by the role that needs them. Installers (main.INSTALLERS), uv tools
+# (UV_TOOLS), custom commands (COMMANDS_TO_RUN) and the tagged system packages (PACKAGE_MAP)
+# carry "tags"; a run installs the items that have at least one of the selected tags.
+#
+# "base":     Everyday tooling every machine gets
+# "ad":       Active Directory / Windows networks
+# "web":      Web application testing
+# "re":       Reverse engineering and forensics
+# "cracking": Password cracking
+# "desktop":  Graphical applications, pointless on headless machines
+TAGS = ["base", "ad", "web", "re", "cracking", "desktop"]
+
+# Named sets of tags, selected with '--profile'.
+PROFILES = {
+    "full": TAGS,
+    "headless": [tag for tag in TAGS if tag != "desktop"],
+    "ad": ["base", "ad"],
+    "web": ["base", "web"],
+    "re": ["base", "re"],
+    "cracking": ["base", "cracking"],
+}
+DEFAULT_PROFILE = "full"
+
+def resolve(profile=DEFAULT_PROFILE, include=(), exclude=()):
+    """
+    Returns the selected tags: the profile's tags plus 'include', minus 'exclude'.
+    """
+    return sorted((set(PROFILES[profile]) | set(include or ())) - set(exclude or ()))
+
+def is_selected(item, tags):
+    """
+    Returns True if an item (a dict with "tags") has one of the selected tags.
+    Items without "tags" are always selected; tags=None selects everything.
+    """
+    if tags is None or "tags" not in item:
+        return True
+    return bool(set(item["tags"]) & set(tags))
+
+def parse_tags(value):
+    """
+    argparse type for a comma-separated list of tags.
+    """
+    tags = [tag.strip() for tag in value.split(",") if tag.strip()]
+    unknown = [tag for tag in tags if tag not in TAGS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown tag(s): {', '.join(unknown)} (choose from {', '.join(TAGS)})")
+    return tags
+
+if __name__ == "__main__":
+    for profile_name, profile_tags in PROFILES.items():
+        print(f"{profile_name}: {', '.join(profile_tags)}")
@@ -1,105 +1,486 @@
 # Save this file as uv_tools_installer.py
+import csv
+import os
+import re
 import sys
 import shutil
 import subprocess
+import sysconfig
+import tempfile
+from pathlib import Path
+from utils import event_stream, tool_profiles, version_tracker
+
+# Default location of the prebuilt wheelhouse. Point it at a shared mount
+# (NFS, SMB, ...) to let every host reuse the same wheels.
+# Layout: <wheelhouse>/<package>/<python tag>/<commit>/*.whl plus a 'LATEST' file per package
+# and python tag. The python tag (see get_python_tag) keeps hosts with another interpreter or
+# platform from picking up wheels they cannot install.
+WHEELHOUSE_DIR = Path.home() / ".cache" / "autoinstaller" / "wheelhouse"
 
 # The list now uses a dictionary to be more explicit.
 # We check for a REAL impacket executable, like 'secretsdump.py'.
+# "package" is the distribution name, used to install from the wheelhouse.
+# "tags" selects the tool by role (see utils/tool_profiles.py).
+# "layer": (Optional) Tools with the same layer share one environment with '--uv-shared-layers'.
 UV_TOOLS = [
     {
         "check_name": "netexec",
+        "package": "netexec",
         "display_name": "NetExec",
         "url": "https://github.com/Pennyw0rth/NetExec",
-        "extra": None
+        "extra": None,
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "bloodyAD",
+        "package": "bloodyAD",
         "display_name": "BloodyAD",
         "url": "https://github.com/CravateRouge/bloodyAD",
-        "extra": None
+        "extra": None,
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "certipy",
+        "package": "certipy-ad",
         "display_name": "Certipy",
         "url": "https://github.com/ly4k/Certipy",
-        "extra": None
+        "extra": None,
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "vol",
+        "package": "volatility3",
         "display_name": "Volatility3",
         "url": "https://github.com/volatilityfoundation/volatility3",
-        "extra": None
+        "extra": None,
+        "tags": ["re"]
     },
     {
         "check_name": "mitmproxy",
+        "package": "mitmproxy",
         "display_name": "mitmproxy",
         "url": "https://github.com/mitmproxy/mitmproxy",
-        "extra": None
+        "extra": None,
+        "tags": ["web"]
     },
     {
         "check_name": "powerview",
+        "package": "powerview",
         "display_name": "powerview.py",
         "url": "https://github.com/aniqfakhrul/powerview.py",
-        "extra": None
+        "extra": None,
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "evil-winrm-py",
+        "package": "evil-winrm-py",
         "display_name": "evil-winrm",
         "url": "https://github.com/adityatelange/evil-winrm-py",
-        "extra": "kerberos"
+        "extra": "kerberos",
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "secretsdump.py",
+        "package": "impacket",
         "display_name": "Impacket Suite",
         "url": "https://github.com/fortra/impacket",
-        "extra": None
+        "extra": None,
+        "tags": ["ad"],
+        "layer": "ad"
     },
     {
         "check_name": "oleid",
+        "package": "oletools",
         "display_name": "Ole Tools",
         "url": "https://github.com/decalage2/oletools",
-        "extra": None
+        "extra": None,
+        "tags": ["re"]
     }
 ]
 
-def install():
+# With '--uv-shared-layers', the tools of a layer are resolved together into one environment
+# under SHARED_LAYERS_DIR, so impacket, ldap3, cryptography, ... are installed once instead of
+# once per tool. Each tool's own executables are linked into LOCAL_BIN. If the tools of a layer
+# cannot be resolved together, they are installed one by one with 'uv tool install' as usual.
+SHARED_LAYERS_DIR = Path.home() / ".local" / "share" / "autoinstaller" / "uv-layers"
+LOCAL_BIN = Path.home() / ".local" / "bin"
+
+# uv links installed files from its cache instead of copying them. Hard links need the cache
+# and the environments on the same filesystem; report_sharing() shows whether that worked.
+UV_LINK_MODE = "hardlink"
+UV_TOOL_DIR = Path(os.environ.get("UV_TOOL_DIR", Path.home() / ".local" / "share" / "uv" / "tools"))
+
+def get_uv_env():
+    env = os.environ.copy()
+    env["UV_LINK_MODE"] = UV_LINK_MODE
+    return env
+
+def get_state_name(tool):
+    """
+    Returns the name a tool is recorded under in the version tracker.
+    """
+    return f"uv:{tool['package']}"
+
+def normalize_name(package):
+    """
+    Returns the normalized form of a distribution name (PEP 503), as uv names its tool directories.
+    """
+    return re.sub(r"[-_.]+", "-", package).lower()
+
+def get_requirement(tool):
+    """
+    Returns the requirement string for a tool, including its optional extra.
+    """
+    if tool["extra"]:
+        return f"{tool['package']}[{tool['extra']}]"
+    return tool["package"]
+
+def get_python_tag():
+    """
+    Returns the interpreter and platform the wheels are built for, e.g. 'cpython-311-linux-x86_64'.
+    """
+    return f"{sys.implementation.cache_tag}-{sysconfig.get_platform()}"
+
+def get_wheel_dir(tool, wheelhouse, commit=None):
+    """
+    Returns the wheelhouse directory of a tool for this interpreter (or of one commit of it).
+    """
+    path = Path(wheelhouse) / tool["package"] / get_python_tag()
+    return path / commit if commit else path
+
+def get_wheelhouse_commit(tool, wheelhouse):
+    """
+    Returns the commit recorded as the latest build of a tool in the wheelhouse,
+    or None if the wheelhouse holds no complete build of it for this interpreter.
+    """
+    latest_file = get_wheel_dir(tool, wheelhouse) / "LATEST"
+    if not latest_file.exists():
+        return None
+    commit = latest_file.read_text().strip()
+    if not (latest_file.parent / commit).is_dir():
+        return None
+    return commit
+
+def build_wheelhouse(wheelhouse=WHEELHOUSE_DIR):
+    """
+    Builds wheels for every tool in UV_TOOLS (and all of its dependencies)
+    into the wheelhouse, keyed by this interpreter and the upstream commit.
+    Tools whose current commit is already in the wheelhouse are skipped.
+    """
+    print(f"\n--- Building wheelhouse for 'uv tool' packages in {wheelhouse} ---")
+    if not shutil.which('git'):
+        print("ERROR: 'git' command not found."); return False
+
+    wheelhouse = Path(wheelhouse)
+    wheelhouse.mkdir(parents=True, exist_ok=True)
+    all_ok = True
+
+    for tool in UV_TOOLS:
+        display_name = tool["display_name"]
+        url = tool["url"]
+        print(f"\nProcessing tool: {display_name}")
+
+        try:
+            commit = version_tracker.get_upstream_commit(url)
+            package_dir = get_wheel_dir(tool, wheelhouse)
+            commit_dir = package_dir / commit
+
+            if commit_dir.is_dir():
+                print(f"Wheels for {display_name} at {commit[:12]} already built. Skipping.")
+            else:
+                print(f"Building wheels for '{display_name}' at {commit[:12]}...")
+                package_dir.mkdir(parents=True, exist_ok=True)
+                # Build into a sibling temporary directory and rename it into place,
+                # so a concurrent reader never sees a half-populated commit directory.
+                staging_dir = Path(tempfile.mkdtemp(prefix=f".{commit}-", dir=package_dir))
+                try:
+                    requirement = f"{get_requirement(tool)} @ git+{url}@{commit}"
+                    command = [sys.executable, "-m", "pip", "wheel", "--wheel-dir", str(staging_dir), requirement]
+                    # The wheels of the tool and all of its dependencies are what it downloads
+                    event_stream.download(command, url, staging_dir, check=True, capture_output=True, text=True)
+                    os.rename(staging_dir, commit_dir)
+                finally:
+                    if staging_dir.exists():
+                        shutil.rmtree(staging_dir, ignore_errors=True)
+                print(f"Wheels for '{display_name}' built successfully.")
+
+            (package_dir / "LATEST").write_text(commit + "\n")
+
+        except subprocess.CalledProcessError as e:
+            print(f"\nERROR: Failed to build wheels for '{display_name}': {e}\nStderr: {e.stderr}")
+            all_ok = False
+        except Exception as e:
+            print(f"\nAn unexpected error occurred while building wheels for '{display_name}': {e}")
+            all_ok = False
+
+    return all_ok
+
+def get_dist_info(site_packages, package):
+    """
+    Returns the .dist-info directory of an installed distribution, or None.
+    """
+    normalized = re.sub(r"[-_.]+", "_", package).lower()
+    return next((path for path in Path(site_packages).glob("*.dist-info")
+                 if path.name.split("-")[0].lower() == normalized), None)
+
+def get_executables(dist_info, bin_dir):
+    """
+    Returns the names of the files a distribution installed into 'bin_dir', as listed in its
+    RECORD: entry points as well as plain scripts (e.g. impacket's 'secretsdump.py').
+    """
+    names = []
+    with open(dist_info / "RECORD", "r", newline="") as f:
+        for row in csv.reader(f):
+            path = (dist_info.parent / row[0]).resolve() if row else None
+            if path and path.parent == Path(bin_dir).resolve():
+                names.append(path.name)
+    return names
+
+def get_layer_tools(layer, tags=None):
+    return [tool for tool in UV_TOOLS if tool.get("layer") == layer and tool_profiles.is_selected(tool, tags)]
+
+def remove_layer(env_dir):
+    """
+    Deletes a layer environment together with its links in LOCAL_BIN, so no dangling link
+    keeps 'uv tool install' from placing the executables of the tools installed separately.
+    """
+    shutil.rmtree(env_dir, ignore_errors=True)
+    if not LOCAL_BIN.is_dir():
+        return
+    for link in LOCAL_BIN.iterdir():
+        if link.is_symlink() and Path(os.readlink(link)).parent == env_dir / "bin":
+            link.unlink()
+
+def install_layer(layer, tools, wheelhouse=None):
+    """
+    Resolves the tools together into the shared environment of 'layer' and links their
+    executables into LOCAL_BIN. Returns True on success; on failure nothing is linked.
+    """
+    env_dir = SHARED_LAYERS_DIR / layer
+    print(f"\nInstalling {', '.join(tool['display_name'] for tool in tools)} into the shared '{layer}' layer...")
+    requirements, index_options, commits = [], [], {}
+    wheel_commits = {tool["package"]: get_wheelhouse_commit(tool, wheelhouse) for tool in tools} if wheelhouse else {}
+    # The wheels are only used without the index, or uv could pick a newer release from PyPI
+    # than the recorded commit. So the wheelhouse has to hold every tool of the layer.
+    use_wheelhouse = bool(wheel_commits) and all(wheel_commits.values())
+    if wheelhouse and not use_wheelhouse:
+        print(f"The wheelhouse does not hold every tool of the '{layer}' layer. Building the layer from source.")
+    for tool in tools:
+        if use_wheelhouse:
+            commit = wheel_commits[tool["package"]]
+            index_options += ["--find-links", str(get_wheel_dir(tool, wheelhouse, commit))]
+            requirements.append(get_requirement(tool))
+        else:
+            commit = version_tracker.get_upstream_commit(tool["url"])
+            requirements.append(f"{get_requirement(tool)} @ git+{tool['url']}@{commit}")
+        commits[tool["package"]] = commit
+    if use_wheelhouse:
+        index_options.append("--no-index")
+
+    # Resolve first, so incompatible tools never touch the existing layer.
+    try:
+        event_stream.run([sys.executable, "-m", "uv", "pip", "compile", "--python", sys.executable, *index_options, "-"],
+                       input="\n".join(requirements), check=True, capture_output=True, text=True, env=get_uv_env())
+    except subprocess.CalledProcessError as e:
+        reason = (e.stderr or "").strip().splitlines()
+        print(f"The '{layer}' layer cannot be resolved together: {reason[-1].strip() if reason else e}")
+        print("Installing its tools separately.")
+        return False
+
+    # Scripts in a venv hard-code its path, so the layer is built in place.
+    SHARED_LAYERS_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.rmtree(env_dir, ignore_errors=True)
+    try:
+        event_stream.run([sys.executable, "-m", "uv", "venv", "--python", sys.executable, str(env_dir)],
+                       check=True, capture_output=True, text=True, env=get_uv_env())
+        command = [sys.executable, "-m", "uv", "pip", "install", "--python", str(env_dir / "bin" / "python"),
+                   *index_options, *requirements]
+        if use_wheelhouse:
+            event_stream.run(command, check=True, capture_output=True, text=True, env=get_uv_env())
+        else:
+            event_stream.download(command, " ".join(tool["url"] for tool in tools),
+                                  check=True, capture_output=True, text=True, env=get_uv_env())
+    except subprocess.CalledProcessError as e:
+        remove_layer(env_dir)
+        print(f"\nERROR: Failed to install the '{layer}' layer: {e}\nStderr: {e.stderr}")
+        print("Installing its tools separately.")
+        return False
+
+    # Nothing outside the layer is touched until every tool is found in it
+    site_packages = next((env_dir / "lib").glob("python*/site-packages"))
+    executables = {}
+    for tool in tools:
+        dist_info = get_dist_info(site_packages, tool["package"])
+        if dist_info is None:
+            remove_layer(env_dir)
+            print(f"\nERROR: '{tool['package']}' is missing from the '{layer}' layer. Installing its tools separately.")
+            return False
+        executables[tool["package"]] = get_executables(dist_info, env_dir / "bin")
+
+    try:
+        LOCAL_BIN.mkdir(parents=True, exist_ok=True)
+        for tool in tools:
+            for name in executables[tool["package"]]:
+                link = LOCAL_BIN / name
+                if link.exists() or link.is_symlink():
+                    link.unlink()
+                link.symlink_to(env_dir / "bin" / name)
+    except OSError as e:
+        remove_layer(env_dir)
+        print(f"\nERROR: Failed to link the '{layer}' layer into {LOCAL_BIN}: {e}")
+        print("Installing its tools separately.")
+        return False
+
+    for tool in tools:
+        # The separate 'uv tool' environment of the tool is no longer needed. Its directory is
+        # removed directly: 'uv tool uninstall' would also delete the links made above.
+        shutil.rmtree(UV_TOOL_DIR / normalize_name(tool["package"]), ignore_errors=True)
+        version_tracker.record_install(get_state_name(tool), commits[tool["package"]])
+        print(f"'{tool['display_name']}' installed successfully (shared '{layer}' layer).")
+    return True
+
+def report_sharing(paths):
+    """
+    Prints how much of the installed Python environments is hard-linked to the uv cache
+    (or to each other) instead of being stored again.
+    """
+    total_files = linked_files = linked_bytes = 0
+    for path in paths:
+        for root, _, names in os.walk(path):
+            for name in names:
+                try:
+                    info = os.lstat(os.path.join(root, name))
+                except OSError:
+                    continue
+                total_files += 1
+                if info.st_nlink > 1:
+                    linked_files += 1
+                    linked_bytes += info.st_size
+    if total_files:
+        print(f"\nPython tool environments: {linked_files} of {total_files} files hard-linked to the uv cache "
+              f"({linked_bytes // (1024 * 1024)} MB not stored again).")
+        if linked_files == 0:
+            print("WARNING: Nothing is hard-linked. Keep the uv cache (UV_CACHE_DIR) on the same filesystem as the tools.")
+
+def get_source_install(tool, force=False):
+    """
+    Returns the 'uv tool install' command that builds a tool from its repository, pinned to
+    the upstream commit so the installed version can be recorded, and that commit (or None).
+    """
+    upstream_commit = None
+    try:
+        upstream_commit = version_tracker.get_upstream_commit(tool["url"])
+    except Exception as e:
+        print(f"WARNING: Could not query the upstream commit of '{tool['display_name']}': {e}")
+
+    # Construct the source URL with the optional extra
+    source_url = f"git+{tool['url']}"
+    if upstream_commit:
+        source_url += f"@{upstream_commit}"
+    if tool["extra"]:
+        source_url += f"[{tool['extra']}]"
+    return [sys.executable, "-m", "uv", "tool", "install", *(["--force"] if force else []), source_url], upstream_commit
+
+def install(wheelhouse=None, force=False, packages=None, tags=None, shared_layers=False):
     """
     Installs a list of Python tools using 'uv tool install', checking for
     a specific executable to determine if the tool is already installed.
+
+    If 'wheelhouse' is given, tools built into it by build_wheelhouse() are
+    installed from the local wheels only, without cloning or compiling. If that
+    fails, they are installed from source instead.
+    'packages' limits the run to those package names and force=True
+    reinstalls them even if present (used by update mode). 'tags' limits
+    the run to the tools tagged for the selected roles. With 'shared_layers',
+    tools with a "layer" are installed into a shared environment per layer.
     """
     print("\n--- Installing Python tools with 'uv tool' ---")
     if not shutil.which('uv'):
         print("ERROR: 'uv' command not found."); return
 
+    layered = set()
+    if shared_layers:
+        for layer in sorted({tool["layer"] for tool in UV_TOOLS if tool.get("layer")}):
+            tools = get_layer_tools(layer, tags)
+            pending = [tool for tool in tools if (packages is None or tool["package"] in packages)
+                       and (force or not shutil.which(tool["check_name"]))]
+            if not pending:
+                continue
+            # The layer is resolved as a whole, so every tool of it is (re)installed
+            try:
+                if install_layer(layer, tools, wheelhouse):
+                    layered.update(tool["package"] for tool in tools)
+            except Exception as e:
+                print(f"\nAn unexpected error occurred while installing the '{layer}' layer: {e}")
+
     for tool in UV_TOOLS:
         check_name = tool["check_name"]
         display_name = tool["display_name"]
         url = tool["url"]
         extra = tool["extra"]
 
+        if packages is not None and tool["package"] not in packages:
+            continue
+        if not tool_profiles.is_selected(tool, tags) or tool["package"] in layered:
+            continue
+
         print(f"\nProcessing tool: {display_name}")
         
         # This is now the one, correct way to check for all tools.
-        if shutil.which(check_name):
+        if shutil.which(check_name) and not force:
             print(f"Executable '{check_name}' found. Skipping installation of {display_name}.")
             continue
         
-        # Construct the source URL with the optional extra
-        source_url = f"git+{url}"
-        if extra:
-            source_url += f"[{extra}]"
-            print(f"Installing '{display_name}' from {url} with '{extra}' support...")
+        commit = get_wheelhouse_commit(tool, wheelhouse) if wheelhouse else None
+        if wheelhouse:
+            event_stream.emit("cache", cache="wheelhouse", key=tool["package"], hit=commit is not None)
+
+        upstream_commit = None
+        if commit:
+            print(f"Installing '{display_name}' from the wheelhouse ({commit[:12]})...")
+            # The wheels were built for this interpreter (see get_python_tag)
+            command = [sys.executable, "-m", "uv", "tool", "install", *(["--force"] if force else []),
+                       "--python", sys.executable, "--offline", "--no-index",
+                       "--find-links", str(get_wheel_dir(tool, wheelhouse, commit)), get_requirement(tool)]
         else:
-            print(f"Installing '{display_name}' from {url}...")
-            
+            if wheelhouse:
+                print(f"No wheels for '{display_name}' in {wheelhouse}. Falling back to a source install.")
+            if extra:
+                print(f"Installing '{display_name}' from {url} with '{extra}' support...")
+            else:
+                print(f"Installing '{display_name}' from {url}...")
+            command, upstream_commit = get_source_install(tool, force)
+
         try:
-            command = [sys.executable, "-m", "uv", "tool", "install", source_url]
-            subprocess.run(command, check=True, capture_output=True, text=True)
+            try:
+                if commit:
+                    event_stream.run(command, check=True, capture_output=True, text=True, env=get_uv_env())
+                else:
+                    event_stream.download(command, url, check=True, capture_output=True, text=True, env=get_uv_env())
+            except subprocess.CalledProcessError as e:
+                if not commit:
+                    raise
+                reason = (e.stderr or "").strip().splitlines()
+                print(f"WARNING: The wheelhouse install of '{display_name}' failed ({reason[-1].strip() if reason else e}). "
+                      "Falling back to a source install.")
+                commit = None
+                command, upstream_commit = get_source_install(tool, force)
+                event_stream.download(command, url, check=True, capture_output=True, text=True, env=get_uv_env())
+            installed_commit = commit or upstream_commit
+            if installed_commit:
+                version_tracker.record_install(get_state_name(tool), installed_commit)
             print(f"'{display_name}' installed successfully.")
         except subprocess.CalledProcessError as e:
             print(f"\nERROR: Failed to install '{display_name}': {e}\nStderr: {e.stderr}")
         except Exception as e:
             print(f"\nAn unexpected error occurred while installing '{display_name}': {e}")
 
+    report_sharing([UV_TOOL_DIR, SHARED_LAYERS_DIR])
+
 if __name__ == "__main__":
-    install()
+    install(shared_layers="--shared-layers" in sys.argv)
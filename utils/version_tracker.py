@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# --- CONFIGURATION ---
+# Records which upstream commit each tool was built from.
+STATE_FILE = Path.home() / ".local" / "share" / "autoinstaller" / "installed.json"
+
+# Number of versions per tool whose commit is remembered for rollbacks.
+HISTORY_SIZE = 5
+
+# Number of 'git ls-remote' queries run at the same time.
+MAX_PARALLEL_QUERIES = 16
+
+def get_upstream_commit(url):
+    """
+    Returns the commit hash of the remote HEAD using a cheap 'git ls-remote'.
+    """
+    result = subprocess.run(["git", "ls-remote", url, "HEAD"], check=True, capture_output=True, text=True, timeout=60)
+    return result.stdout.split()[0]
+
+def get_upstream_commits(sources):
+    """
+    Queries the remote HEAD of every {name: url} source concurrently.
+    Returns {name: commit}, with None for sources that could not be queried.
+    """
+    def query(url):
+        try:
+            return get_upstream_commit(url)
+        except Exception as e:
+            print(f"WARNING: Could not query {url}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_QUERIES) as executor:
+        futures = {name: executor.submit(query, url) for name, url in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def get_local_commit(repo_path):
+    """
+    Returns the commit checked out in a local clone.
+    """
+    # Clones under /opt are owned by root, so mark them safe for this one call
+    command = ["git", "-c", f"safe.directory={repo_path}", "rev-parse", "HEAD"]
+    result = subprocess.run(command, cwd=str(repo_path), check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+def load_state():
+    try:
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def get_installed(name):
+    """
+    Returns the recorded install details of a tool, or an empty dict.
+    """
+    return load_state().get(name, {})
+
+def get_installed_commit(name):
+    return get_installed(name).get("commit")
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = STATE_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, STATE_FILE)
+
+def record_install(name, commit, version=None, **details):
+    """
+    Records the commit a tool was installed from, plus any extra details.
+    For versioned installs the entry is also remembered under its version, for record_rollback().
+    """
+    state = load_state()
+    history = state.get(name, {}).get("history", {})
+    entry = {"commit": commit, "installed_at": int(time.time()), **details}
+    if version:
+        entry["version"] = version
+        history[version] = {"commit": commit, **details}
+    if history:
+        entry["history"] = {key: history[key] for key in sorted(history)[-HISTORY_SIZE:]}
+    state[name] = entry
+    save_state(state)
+
+def record_rollback(name, version):
+    """
+    Points the record of a tool at the version it was rolled back to. If the commit of
+    that version is unknown, the commit is forgotten, so the next update rebuilds the tool.
+    """
+    state = load_state()
+    if name not in state:
+        return
+    history = state[name].get("history", {})
+    state[name] = {**history.get(version, {}), "version": version, "installed_at": int(time.time())}
+    if history:
+        state[name]["history"] = history
+    save_state(state)
+
+def find_outdated(sources):
+    """
+    Compares the upstream HEAD of every {name: url} source with the recorded commit.
+    Returns {name: upstream_commit} for the sources that changed or were never recorded.
+    """
+    upstream = get_upstream_commits(sources)
+    outdated = {}
+    for name, commit in upstream.items():
+        if commit is None:
+            continue
+        installed = get_installed_commit(name)
+        if installed == commit:
+            print(f"'{name}' is up to date ({commit[:12]}).")
+        else:
+            print(f"'{name}' changed: {installed[:12] if installed else 'unknown'} -> {commit[:12]}")
+            outdated[name] = commit
+    return outdated
+
+if __name__ == "__main__":
+    for name, details in load_state().items():
+        print(f"{name}: {details.get('commit')}")
@@ -0,0 +1,143 @@
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from utils import privileged_helper
+
+# --- CONFIGURATION ---
+# Layout: /opt/<tool>/<version>/ plus /opt/<tool>/current -> <version>
+# Number of previous versions kept next to the active one for rollback.
+RETAIN_VERSIONS = 2
+
+CURRENT_LINK = "current"
+
+# Name of the version the old flat /opt/<tool> layout is migrated to (sorts before any real version).
+LEGACY_VERSION = "00000000000000-legacy"
+
+# Versions made before microseconds were added have a 14-digit timestamp.
+VERSION_PATTERN = re.compile(r"^\d{14}(\d{6})?-")
+
+def make_version(label):
+    """
+    Returns a new version directory name. The timestamp prefix makes names sort by install time,
+    and its microseconds keep two deploys within the same second apart.
+    """
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{label}"
+
+def get_current_version(install_dir):
+    """
+    Returns the version the 'current' symlink points to, or None.
+    """
+    link = Path(install_dir) / CURRENT_LINK
+    if not link.is_symlink():
+        return None
+    return os.path.basename(os.readlink(link))
+
+def list_versions(install_dir):
+    """
+    Returns the installed versions, oldest first.
+    """
+    install_dir = Path(install_dir)
+    if not install_dir.is_dir():
+        return []
+    return sorted(entry.name for entry in install_dir.iterdir()
+                  if entry.is_dir() and not entry.is_symlink() and VERSION_PATTERN.match(entry.name))
+
+def is_legacy(install_dir):
+    """
+    Returns True if install_dir holds an old flat installation instead of versions.
+    """
+    install_dir = Path(install_dir)
+    if not install_dir.is_dir() or (install_dir / CURRENT_LINK).is_symlink():
+        return False
+    return any(not entry.name.startswith(".") and not VERSION_PATTERN.match(entry.name)
+               for entry in install_dir.iterdir())
+
+def is_installed(install_dir):
+    """
+    Returns True if 'current' points at an installed version. Old flat installations
+    only count once migrate_legacy() has moved them.
+    """
+    return (Path(install_dir) / CURRENT_LINK).exists()
+
+def migrate_legacy(install_dir):
+    """
+    Moves an old flat /opt/<tool> installation to /opt/<tool>/<LEGACY_VERSION> and points
+    'current' at it. Only renames are involved, so the tool stays usable.
+    """
+    install_dir = Path(install_dir)
+    if not is_legacy(install_dir):
+        return
+    print(f"Migrating {install_dir} to the versioned layout...")
+    legacy_tmp = install_dir.with_name(install_dir.name + ".legacy")
+    privileged_helper.run("move", source=str(install_dir), destination=str(legacy_tmp), check=True)
+    privileged_helper.run("mkdir", path=str(install_dir), check=True)
+    privileged_helper.run("move", source=str(legacy_tmp), destination=str(install_dir / LEGACY_VERSION), check=True)
+    activate(install_dir, LEGACY_VERSION)
+
+def activate(install_dir, version):
+    """
+    Atomically points 'current' at a version: a temporary symlink is created
+    and renamed over the old one, so there is never a moment without 'current'.
+    """
+    install_dir = Path(install_dir)
+    tmp_link = install_dir / f".{CURRENT_LINK}.tmp"
+    privileged_helper.run("link", target=version, path=str(tmp_link), check=True)
+    privileged_helper.run("move", source=str(tmp_link), destination=str(install_dir / CURRENT_LINK), check=True)
+
+def staging_dir(install_dir, label):
+    """
+    Returns a hidden path inside install_dir to build or clone into, so the
+    final move into place is a cheap rename on the same filesystem.
+    """
+    install_dir = Path(install_dir)
+    migrate_legacy(install_dir)
+    privileged_helper.run("mkdir", path=str(install_dir), check=True)
+    return install_dir / f".staging-{make_version(label)}"
+
+def deploy(source_dir, install_dir, label, keep=RETAIN_VERSIONS):
+    """
+    Moves a fully built source_dir to /opt/<tool>/<version>, switches 'current'
+    to it and prunes old versions. Returns the new version name.
+    """
+    install_dir = Path(install_dir)
+    migrate_legacy(install_dir)
+    privileged_helper.run("mkdir", path=str(install_dir), check=True)
+
+    version = make_version(label)
+    privileged_helper.run("move", source=str(source_dir), destination=str(install_dir / version), check=True)
+    activate(install_dir, version)
+    print(f"Activated version '{version}' in {install_dir}.")
+
+    prune(install_dir, keep)
+    return version
+
+def prune(install_dir, keep=RETAIN_VERSIONS):
+    """
+    Removes all but the newest 'keep' inactive versions. This runs after the
+    switch, so the recursive delete is never on the critical path.
+    """
+    current = get_current_version(install_dir)
+    inactive = [version for version in list_versions(install_dir) if version != current]
+    stale = inactive[:-keep] if keep > 0 else inactive
+    for version in stale:
+        print(f"Removing old version '{version}'...")
+        privileged_helper.run("remove", paths=[str(Path(install_dir) / version)], recursive=True, check=True)
+
+def rollback(install_dir):
+    """
+    Switches 'current' back to the newest inactive version. Returns it, or None.
+    """
+    current = get_current_version(install_dir)
+    versions = list_versions(install_dir)
+    if current in versions:
+        candidates = versions[:versions.index(current)]
+    else:
+        candidates = versions
+    if not candidates:
+        print(f"No previous version to roll back to in {install_dir}.")
+        return None
+    previous = candidates[-1]
+    activate(install_dir, previous)
+    print(f"Rolled back {install_dir} from '{current}' to '{previous}'.")
+    return previous
@@ -1,10 +1,86 @@
 import subprocess
 import shutil
+from pathlib import Path
+from utils import privileged_helper
+
+# --- CONFIGURATION ---
+# Visual Studio Code comes from Microsoft's repository on Debian/Ubuntu and Fedora; Arch installs
+# the 'code' package from its own repositories. The repository is added by main.py before the
+# system package transaction, which installs 'code' together with everything else
+# (see THIRD_PARTY_REPOSITORIES there); install() below is only the stand-alone fallback.
+PACKAGES = ["code"]
+
+KEY_URL = "https://packages.microsoft.com/keys/microsoft.asc"
+APT_KEYRING = "/etc/apt/keyrings/packages.microsoft.gpg"
+APT_SOURCE = "/etc/apt/sources.list.d/vscode.list"
+# The 'code' package ships its own source (vscode.sources), so any source with this URL counts
+APT_REPO_URL = "packages.microsoft.com/repos/code"
+APT_SOURCE_FILES = ["/etc/apt/sources.list", "/etc/apt/sources.list.d/*.list", "/etc/apt/sources.list.d/*.sources"]
+# Architectures Microsoft publishes packages for, as reported by 'dpkg --print-architecture'
+APT_ARCHITECTURES = ["amd64", "arm64", "armhf"]
+
+DNF_REPO_FILE = "/etc/yum.repos.d/vscode.repo"
+DNF_REPO_URL = "packages.microsoft.com/yumrepos/vscode"
+DNF_REPO_FILES = ["/etc/yum.repos.d/*.repo"]
+DNF_REPO = f"""[code]
+name=Visual Studio Code
+baseurl=https://packages.microsoft.com/yumrepos/vscode
+enabled=1
+gpgcheck=1
+gpgkey={KEY_URL}
+"""
+
+def write_file(path, content):
+    privileged_helper.run("mkdir", path=str(Path(path).parent), check=True)
+    privileged_helper.run("write", path=path, input=content, check=True)
+
+def has_source(patterns, url):
+    """
+    Returns True if one of the files matching 'patterns' mentions 'url'.
+    """
+    for pattern in patterns:
+        for path in Path("/").glob(pattern.lstrip("/")):
+            try:
+                if url in path.read_text(errors="replace"):
+                    return True
+            except OSError:
+                continue
+    return False
+
+def add_repository(manager):
+    """
+    Adds Microsoft's repository for 'manager'. Returns the source file if it was added now,
+    or None if it was there already or is not needed.
+    """
+    # Installed already (the package keeps its repository configured itself)
+    if shutil.which("code"):
+        return None
+    if manager == "apt":
+        if Path(APT_SOURCE).exists() or has_source(APT_SOURCE_FILES, APT_REPO_URL):
+            return None
+        arch = subprocess.run(["dpkg", "--print-architecture"], check=True, capture_output=True, text=True).stdout.strip()
+        if arch not in APT_ARCHITECTURES:
+            raise RuntimeError(f"Microsoft does not publish VS Code packages for '{arch}'")
+        print("Adding Microsoft GPG key...")
+        key = subprocess.run(["curl", "-sSL", KEY_URL], check=True, capture_output=True, text=True).stdout
+        privileged_helper.run("mkdir", path=str(Path(APT_KEYRING).parent), check=True)
+        privileged_helper.run("dearmor", path=APT_KEYRING, input=key, check=True)
+        print("Adding VS Code to APT sources...")
+        write_file(APT_SOURCE, f"deb [arch={arch} signed-by={APT_KEYRING}] https://packages.microsoft.com/repos/code stable main\n")
+        return APT_SOURCE
+    if manager == "dnf":
+        if Path(DNF_REPO_FILE).exists() or has_source(DNF_REPO_FILES, DNF_REPO_URL):
+            return None
+        print("Adding VS Code to the dnf repositories...")
+        # dnf imports the key from 'gpgkey' on the first install
+        write_file(DNF_REPO_FILE, DNF_REPO)
+        return DNF_REPO_FILE
+    return None
 
 def install():
     """
-    Installs Visual Studio Code by adding the official Microsoft APT repository.
-    This is the recommended method for Debian/Ubuntu-based systems.
+    Installs Visual Studio Code on its own. Normally 'code' is installed with the
+    system packages already and this only finds it.
     """
     print("\n--- Installing Visual Studio Code ---")
 
@@ -13,36 +89,25 @@ def install():
         print("'code' is already installed. Skipping.")
         return
 
-    print("Setting up the official Microsoft APT repository for VS Code...")
+    manager = next((manager for manager in ["apt", "dnf", "pacman"] if shutil.which(manager)), None)
+    if not manager:
+        print("ERROR: No supported package manager found. Cannot install VS Code.")
+        return
+
     try:
-        # 2. Download and add Microsoft's GPG key
-        print("Adding Microsoft GPG key...")
-        keyring_path = "/etc/apt/keyrings/packages.microsoft.gpg"
-        # Download key to a temporary location
-        curl_cmd = ["curl", "-sSL", "https://packages.microsoft.com/keys/microsoft.asc"]
-        # De-armor and save to final location
-        gpg_cmd = ["sudo", "gpg", "--dearmor", "-o", keyring_path]
-        
-        # Pipe curl output to gpg command
-        p1 = subprocess.Popen(curl_cmd, stdout=subprocess.PIPE)
-        p2 = subprocess.Popen(gpg_cmd, stdin=p1.stdout)
-        p1.stdout.close() # Allow p1 to receive a SIGPIPE if p2 exits.
-        p2.communicate()
-        if p2.returncode != 0:
-            raise subprocess.CalledProcessError(p2.returncode, gpg_cmd)
-
-        # 3. Add the VS Code repository source list
-        print("Adding VS Code to APT sources...")
-        repo_string = f"deb [arch=amd64 signed-by={keyring_path}] https://packages.microsoft.com/repos/code stable main"
-        add_repo_cmd = ["sudo", "sh", "-c", f'echo "{repo_string}" > /etc/apt/sources.list.d/vscode.list']
-        subprocess.run(add_repo_cmd, check=True)
-
-        # 4. Update package list and install 'code'
-        print("Updating package list...")
-        subprocess.run(["sudo", "apt", "update"], check=True, capture_output=True)
-        
+        source = add_repository(manager)
         print("Installing 'code' package...")
-        subprocess.run(["sudo", "apt", "install", "-y", "code"], check=True)
+        if manager == "apt":
+            if source:
+                # Refresh only the new source, not every configured one
+                privileged_helper.run("packages", argv=["apt-get", "update", "-o", f"Dir::Etc::SourceList={source}",
+                                                        "-o", "Dir::Etc::SourceParts=-", "-o", "APT::Get::List-Cleanup=0"],
+                                      check=True, capture_output=True)
+            privileged_helper.run("packages", argv=["apt", "install", "-y", *PACKAGES], check=True)
+        elif manager == "dnf":
+            privileged_helper.run("packages", argv=["dnf", "install", "-y", *PACKAGES], check=True)
+        else:
+            privileged_helper.run("packages", argv=["pacman", "-S", "--noconfirm", "--needed", *PACKAGES], check=True)
 
         print("Visual Studio Code installed successfully.")
 
@@ -52,4 +117,4 @@ def install():
         print(f"\nAn unexpected error occurred during VS Code installation: {e}")
 
 if __name__ == "__main__":
-    install()
\ No newline at end of file
+    install()
@@ -0,0 +1,246 @@
+import array
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# --- CONFIGURATION ---
+# Catalog of the SecLists wordlists, built after SecLists is unpacked (see command_runner).
+# Everything is written to INDEX_DIR, the SecLists tree itself is never modified:
+#   catalog.json    {"root", "built_at", "lists": [entry], "merged": {name: {"path", "lines", "sources"}}}
+#                   where an entry is {"path", "category", "lines", "size", "sha256", "duplicate_of"}
+#   <name>.txt      Merged, deduplicated list of a category, sorted bytewise (LC_ALL=C)
+#   <name>.idx      Offsets of the lines of <name>.txt as native unsigned 64-bit integers,
+#                   so a lookup is a binary search over two memory-mapped files
+SECLISTS_DIR = Path("/opt/SecLists-master")
+INDEX_DIR = Path.home() / ".local" / "share" / "autoinstaller" / "wordlists"
+
+# Merged lists: name -> SecLists directories whose wordlists are merged into it.
+MERGED_LISTS = {
+    "web-content": ["Discovery/Web-Content"],
+    "dns": ["Discovery/DNS"],
+    "passwords": ["Passwords"],
+    "usernames": ["Usernames"],
+    "fuzzing": ["Fuzzing"],
+}
+
+# Only plain-text files are cataloged (the compressed archives in SecLists are skipped).
+WORDLIST_SUFFIXES = {".txt", ".lst", ".list", ".dic", ""}
+SKIP_NAMES = {"README.md", "LICENSE", "CONTRIBUTING.md"}
+
+MAX_PARALLEL_SCANS = max(1, min(8, os.cpu_count() or 1))
+
+def get_catalog_path():
+    return INDEX_DIR / "catalog.json"
+
+def load_catalog():
+    try:
+        with open(get_catalog_path(), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def is_built(root=SECLISTS_DIR):
+    catalog = load_catalog()
+    return bool(catalog) and catalog["root"] == str(root)
+
+def scan_file(path):
+    """
+    Returns (lines, sha256) of a file in a single read.
+    """
+    lines = 0
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            lines += chunk.count(b"\n")
+            sha256.update(chunk)
+    return lines, sha256.hexdigest()
+
+def find_wordlists(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            path = Path(dirpath) / filename
+            if filename in SKIP_NAMES or path.suffix.lower() not in WORDLIST_SUFFIXES or path.is_symlink():
+                continue
+            yield path
+
+def build_catalog(root):
+    """
+    Returns a catalog entry for every wordlist under 'root'. Files whose content is
+    identical to an earlier file get "duplicate_of" set to that file.
+    """
+    paths = list(find_wordlists(root))
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_SCANS) as executor:
+        scans = list(executor.map(scan_file, paths))
+
+    entries = []
+    first_seen = {}
+    for path, (lines, sha256) in zip(paths, scans):
+        relative = path.relative_to(root)
+        entries.append({
+            "path": str(relative),
+            "category": str(relative.parent),
+            "lines": lines,
+            "size": path.stat().st_size,
+            "sha256": sha256,
+            "duplicate_of": first_seen.get(sha256),
+        })
+        first_seen.setdefault(sha256, str(relative))
+    return entries
+
+def merge(root, sources, output):
+    """
+    Writes the deduplicated, sorted union of 'sources' to 'output' and returns its line count.
+    Lines are normalized (CR stripped, empty lines dropped) and 'sort -u' does the
+    deduplication, so lists larger than memory are fine.
+    """
+    env = os.environ.copy()
+    env["LC_ALL"] = "C"
+    with open(output, "wb") as out:
+        sort = subprocess.Popen(["sort", "-u", "-S", "25%", "-T", str(INDEX_DIR)], stdin=subprocess.PIPE, stdout=out, env=env)
+        try:
+            for source in sources:
+                with open(root / source, "rb") as f:
+                    for line in f:
+                        line = line.rstrip(b"\r\n")
+                        if line:
+                            sort.stdin.write(line + b"\n")
+        finally:
+            sort.stdin.close()
+            if sort.wait() != 0:
+                raise subprocess.CalledProcessError(sort.returncode, "sort")
+    return write_offsets(output)
+
+def write_offsets(path):
+    """
+    Writes the offset index of a sorted list to <path>.idx. Returns the number of lines.
+    """
+    offsets = array.array("Q")
+    position = 0
+    with open(path, "rb") as f:
+        for line in f:
+            offsets.append(position)
+            position += len(line)
+    with open(Path(path).with_suffix(".idx"), "wb") as f:
+        offsets.tofile(f)
+    return len(offsets)
+
+def build(root=SECLISTS_DIR, force=False):
+    """
+    Builds the catalog and the merged lists of the SecLists tree at 'root'.
+    Does nothing if a catalog of the same tree exists, unless 'force' is set.
+    """
+    root = Path(root)
+    print("\n--- Indexing wordlists ---")
+    if not root.is_dir():
+        print(f"'{root}' not found. Skipping wordlist indexing.")
+        return
+    if is_built(root) and not force:
+        print(f"Wordlist catalog already exists at {get_catalog_path()}. Skipping.")
+        return
+
+    try:
+        start = time.monotonic()
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        entries = build_catalog(root)
+        duplicates = sum(1 for entry in entries if entry["duplicate_of"])
+        print(f"Cataloged {len(entries)} wordlists ({duplicates} exact duplicates).")
+
+        merged = {}
+        for name, directories in MERGED_LISTS.items():
+            # Duplicates are skipped within each list only: a file may also be a duplicate
+            # of one that is merged into another list.
+            sources, seen = [], set()
+            for entry in entries:
+                if entry["sha256"] not in seen and any(entry["path"].startswith(directory + "/") for directory in directories):
+                    sources.append(entry["path"])
+                    seen.add(entry["sha256"])
+            if not sources:
+                continue
+            output = INDEX_DIR / f"{name}.txt"
+            lines = merge(root, sources, output)
+            merged[name] = {"path": str(output), "lines": lines, "sources": len(sources)}
+            print(f"Merged {len(sources)} lists into '{name}': {lines} unique entries.")
+
+        catalog = {"root": str(root), "built_at": int(time.time()), "lists": entries, "merged": merged}
+        tmp_file = get_catalog_path().with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(catalog, f)
+        os.replace(tmp_file, get_catalog_path())
+        print(f"Wordlist index built in {time.monotonic() - start:.1f}s at {INDEX_DIR}")
+
+    except subprocess.CalledProcessError as e:
+        print(f"\nERROR: A command failed while indexing wordlists: {e}")
+    except Exception as e:
+        print(f"\nAn unexpected error occurred while indexing wordlists: {e}")
+
+def contains(name, word):
+    """
+    Returns True if 'word' is in the merged list 'name', by binary search over the
+    memory-mapped list and offset index.
+    """
+    list_path = INDEX_DIR / f"{name}.txt"
+    if list_path.stat().st_size == 0:
+        return False
+    word = word.encode() if isinstance(word, str) else word
+    with open(list_path, "rb") as list_file, open(list_path.with_suffix(".idx"), "rb") as index_file:
+        with mmap.mmap(list_file.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+             mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            offsets = memoryview(index).cast("Q")
+            try:
+                low, high = 0, len(offsets)
+                while low < high:
+                    middle = (low + high) // 2
+                    end = offsets[middle + 1] - 1 if middle + 1 < len(offsets) else len(data) - 1
+                    line = data[offsets[middle]:end]
+                    if line == word:
+                        return True
+                    if line < word:
+                        low = middle + 1
+                    else:
+                        high = middle
+                return False
+            finally:
+                offsets.release()
+
+def pick():
+    """
+    Lets the user choose a wordlist with fzf and returns its absolute path (or None).
+    Merged lists are listed first; duplicates are left out.
+    """
+    catalog = load_catalog()
+    if not catalog:
+        print("No wordlist catalog. Run the installer (or 'python -m utils.wordlist_index build') first.")
+        return None
+    if not shutil.which("fzf"):
+        print("ERROR: 'fzf' not found.")
+        return None
+    rows = [f"{info['path']}\t{info['lines']}\tmerged:{name}" for name, info in catalog["merged"].items()]
+    rows += [f"{Path(catalog['root']) / entry['path']}\t{entry['lines']}\t{entry['category']}"
+             for entry in catalog["lists"] if not entry["duplicate_of"]]
+    result = subprocess.run(["fzf", "--delimiter", "\t", "--with-nth", "1,2,3", "--tabstop", "4"],
+                            input="\n".join(rows), stdout=subprocess.PIPE, text=True)
+    return result.stdout.split("\t", 1)[0] if result.returncode == 0 and result.stdout else None
+
+if __name__ == "__main__":
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else "build"
+    if command == "build":
+        build(force="--force" in sys.argv)
+    elif command == "pick":
+        chosen = pick()
+        if chosen:
+            print(chosen)
+    elif command == "contains" and len(sys.argv) == 4:
+        found = contains(sys.argv[2], sys.argv[3])
+        print("yes" if found else "no")
+        sys.exit(0 if found else 1)
+    else:
+        print("Usage: python -m utils.wordlist_index [build [--force] | pick | contains <merged list> <word>]")
+        sys.exit(2)